@@ -0,0 +1,152 @@
+"""
+Parse time of the fantasypros flex and QB projection tables with each table_extractor backend
+against the old BeautifulSoup select() path, plus a check that every backend returns what the
+old path did.
+
+    python benchmarks/fantasypros_tables.py [--repeat N]
+    python benchmarks/fantasypros_tables.py --record    # overwrite the fixtures with the live pages first
+
+The fixtures in fixtures/ keep the projection table markup the extractor depends on: the second
+header row's <small> labels, "mpb-player-<id>" rows, .player-name and td.center cells.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from bs4 import BeautifulSoup
+from function_app import name_flex_projection_columns, name_qb_projection_columns
+from table_extractor import extract_projection_table, _to_number, _PARSERS, HTMLParser, lxml
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+PAGES = [
+    ("flex", "https://www.fantasypros.com/nfl/projections/flex.php?scoring=HALF", "fantasypros_flex_projections.html", name_flex_projection_columns),
+    ("qb", "https://www.fantasypros.com/nfl/projections/qb.php", "fantasypros_qb_projections.html", name_qb_projection_columns),
+]
+
+def select_flex_projections(html_content):
+    """The flex page parse in get_fantasypros_top_players before table_extractor, without name normalization."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    columnToStatNameDict = {}
+    receiving_flag = False
+
+    headers = soup.select('thead tr:nth-of-type(2) th')
+    for idx, header in enumerate(headers):
+        stat_name = header.find('small').text if header.find('small') else ""
+
+        if stat_name == "POS":
+            continue
+        elif stat_name == "ATT":
+            receiving_flag = False
+        elif stat_name == "REC":
+            receiving_flag = True
+
+        if stat_name in ["YDS", "TDS"]:
+            if receiving_flag:
+                stat_name = "REC_" + stat_name
+            else:
+                stat_name = "RUSH_" + stat_name
+
+        columnToStatNameDict[idx] = stat_name
+
+        if stat_name == "FPTS":
+            break
+
+    projections = {}
+    for player_row in soup.select('tbody tr[class^="mpb-player-"]'):
+        player_name = player_row.select_one('.player-name').text.strip()
+        temp_stat_dict = {}
+        for index, stat_element in enumerate(player_row.select('td.center')):
+            stat_name = columnToStatNameDict.get(index + 2)
+            if stat_name:
+                temp_stat_dict[stat_name] = stat_element.text.strip()
+        projections[player_name] = temp_stat_dict
+    return projections
+
+def select_qb_projections(html_content):
+    """The QB page parse in get_fantasypros_top_players before table_extractor, without name normalization."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    columnToStatNameDict = {}
+    rushing_flag = False
+
+    headers = soup.select('thead tr:nth-of-type(2) th')
+    for idx, header in enumerate(headers):
+        stat_name = header.find('small').text if header.find('small') else ""
+
+        if stat_name == "YDS" or stat_name == "TDS":
+            if rushing_flag:
+                stat_name = "RUSH_" + stat_name
+            else:
+                stat_name = "PASS_" + stat_name
+
+        columnToStatNameDict[idx - 1] = stat_name
+        if stat_name == "INTS":
+            rushing_flag = True
+        if stat_name == "FPTS":
+            break
+
+    projections = {}
+    for player_row in soup.select('tbody tr[class^="mpb-player-"]'):
+        player_name = player_row.select_one('.player-name').text.strip()
+        temp_stat_dict = {}
+        for index, stat_element in enumerate(player_row.select('td.center')):
+            stat_name = columnToStatNameDict.get(index)
+            if stat_name:
+                temp_stat_dict[stat_name] = stat_element.text.strip()
+        projections[player_name] = temp_stat_dict
+    return projections
+
+OLD_PARSERS = {"flex": select_flex_projections, "qb": select_qb_projections}
+
+def available_backends():
+    return [
+        backend for backend, available in [("selectolax", HTMLParser is not None), ("lxml", lxml is not None), ("bs4", True)]
+        if available and backend in _PARSERS
+    ]
+
+def best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--record", action="store_true", help="save the live pages over the fixtures first")
+    args = parser.parse_args()
+
+    mismatches = 0
+    for page, url, fixture, column_namer in PAGES:
+        path = os.path.join(FIXTURES_DIR, fixture)
+        if args.record:
+            response = requests.get(url)
+            response.raise_for_status()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(response.text)
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+
+        # The old path kept cells as text, extract_projection_table converts numeric cells
+        old = OLD_PARSERS[page](html)
+        expected = {name: {stat: _to_number(value) for stat, value in stats.items()} for name, stats in old.items()}
+        print(f"{page}: {len(html) / 1e3:.0f} kB, {len(old)} players")
+        print(f"  {'old select()':<12} {best_time(lambda: OLD_PARSERS[page](html), args.repeat) * 1000:8.1f} ms")
+
+        for backend in available_backends():
+            result = extract_projection_table(html, column_namer, backend=backend)
+            matches = result == expected
+            mismatches += not matches
+            elapsed = best_time(lambda: extract_projection_table(html, column_namer, backend=backend), args.repeat)
+            print(f"  {backend:<12} {elapsed * 1000:8.1f} ms  {'matches' if matches else 'DIFFERS from'} old output")
+
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Peak memory of loading the sleeper players dump with load_relevant_sleeper_players against the
+old load-then-delete path. The dump file is served over a local HTTP server, so both paths go
+through requests the way the ingest job does.
+
+    python benchmarks/sleeper_players_memory.py [--dump PATH] [--copies N]
+    python benchmarks/sleeper_players_memory.py --record PATH    # save the live dump, then benchmark it
+
+fixtures/sleeper_players_sample.json is a trimmed dump with the same record layout as
+/v1/players/nfl. --copies repeats its records under new ids to get closer to the ~11k players
+of the live dump.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from config import Config
+from function_app import load_relevant_sleeper_players, ijson
+
+SLEEPER_PLAYERS_URL = "https://api.sleeper.app/v1/players/nfl"
+DEFAULT_DUMP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "sleeper_players_sample.json")
+
+def load_then_delete_sleeper_players(url):
+    """get_sleeper_player_data before the streaming filter: load the whole dump, then delete in place."""
+    resp = requests.get(url=url)
+    data = resp.json()
+
+    for pid in dict(data):
+        if data[pid]["fantasy_positions"] and len(set(data[pid]["fantasy_positions"]).intersection(set(Config.boris_chen_fantasy_relevant_pos))) == 0:
+            del data[pid]
+            continue
+
+        for key in dict(data[pid]):
+            if key not in Config.relevant_sleeper_keys:
+                del data[pid][key]
+    return data
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def serve_file(path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=os.path.dirname(os.path.abspath(path))))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/{os.path.basename(path)}"
+
+def repeat_dump(path, copies):
+    with open(path) as f:
+        dump = json.load(f)
+    repeated = {f"{pid}{copy:03d}" if copy else pid: player for copy in range(copies) for pid, player in dump.items()}
+    handle, repeated_path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(handle, "w") as f:
+        json.dump(repeated, f, separators=(",", ":"))
+    return repeated_path
+
+def measure(loader, url):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    players = loader(url)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return players, peak, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dump", default=DEFAULT_DUMP)
+    parser.add_argument("--copies", type=int, default=1)
+    parser.add_argument("--record", metavar="PATH", help="download the live dump to PATH and benchmark it")
+    args = parser.parse_args()
+
+    dump_path = args.dump
+    if args.record:
+        resp = requests.get(SLEEPER_PLAYERS_URL, timeout=Config.http_timeout_seconds)
+        resp.raise_for_status()
+        with open(args.record, "wb") as f:
+            f.write(resp.content)
+        dump_path = args.record
+    if args.copies > 1:
+        dump_path = repeat_dump(dump_path, args.copies)
+
+    server, url = serve_file(dump_path)
+    try:
+        print(f"{os.path.getsize(dump_path) / 1e6:.1f} MB dump, ijson {'backend ' + ijson.backend if ijson else 'not installed'}")
+        results = {}
+        for name, loader in [("load then delete", load_then_delete_sleeper_players), ("streaming filter", load_relevant_sleeper_players)]:
+            players, peak, elapsed = measure(loader, url)
+            results[name] = players
+            print(f"{name:<18} peak {peak / 1e6:7.2f} MB  {elapsed:6.3f}s  {len(players)} players kept")
+    finally:
+        server.shutdown()
+        if dump_path not in (args.dump, args.record):
+            os.remove(dump_path)
+
+    if results["load then delete"] != results["streaming filter"]:
+        print("Outputs differ")
+        sys.exit(1)
+    print("Outputs identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import threading
+from playwright.async_api import async_playwright
+
+
+class BrowserManager:
+    """
+    One headless Chromium shared by every scrape in an ingest run.
+
+    Playwright objects are bound to the event loop that created them, so the browser
+    lives on a background loop thread and stages hand it async functions through run().
+    Each run() call gets its own isolated browser context, and calls made from different
+    stage threads are interleaved on the loop instead of launching more browsers.
+    """
+
+    def __init__(self, headless=True):
+        self.headless = headless
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+        self._playwright = None
+        self._browser = None
+        self._launch_lock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    async def _get_browser(self):
+        # Launched on first use so runs that never scrape a page don't pay for it
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            if self._browser is None:
+                logging.info("Launching shared headless chromium")
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        return self._browser
+
+    def run(self, func, **context_options):
+        """Call the async func(context) with a fresh browser context and return its result."""
+        async def run_in_context():
+            browser = await self._get_browser()
+            context = await browser.new_context(**context_options)
+            try:
+                return await func(context)
+            finally:
+                await context.close()
+
+        return asyncio.run_coroutine_threadsafe(run_in_context(), self._loop).result()
+
+    def close(self):
+        async def shutdown():
+            if self._browser is not None:
+                await self._browser.close()
+            if self._playwright is not None:
+                await self._playwright.stop()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+
+def run_in_browser(browser_manager, func, **context_options):
+    """run() on the given manager, or on a short lived one when the caller doesn't share a browser."""
+    if browser_manager is not None:
+        return browser_manager.run(func, **context_options)
+    with BrowserManager() as temporary_manager:
+        return temporary_manager.run(func, **context_options)
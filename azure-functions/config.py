@@ -11,6 +11,86 @@ class Config:
 
     azure_storage_connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
     containername = "fantasyjsons"
+    projection_store_blob_name = "hand_calculated_projections.bin"
+    stat_distributions_blob_name = "stat_distributions.json"
+
+    # Compressed, schema versioned copies are written next to the plain JSON blobs as "<name>.ffjz". Readers prefer them,
+    # so turning write_compressed_json_blobs off deletes the compressed copy at the next upload
+    write_plain_json_blobs = True
+    write_compressed_json_blobs = True
+    read_compressed_json_blobs = True
+
+    # Uploads store a sha256 of their content in this blob metadata key and are skipped when it is unchanged,
+    # so unchanged blobs keep their ETag. Payloads over the single put size are uploaded as parallel blocks
+    blob_content_hash_metadata_key = "content_sha256"
+    blob_upload_single_put_bytes = 8 * 1024 * 1024
+    blob_upload_block_bytes = 4 * 1024 * 1024
+    blob_upload_max_concurrency = 4
+
+    # players.json is also split into an identity index plus per-position scoring detail shards
+    write_monolithic_players_blob = True
+    players_index_blob_name = "players/index.json"
+    player_detail_blob_name = "players/{}.json"
+    # Stats of completed weeks are fetched once and then read back from here
+    weekly_stats_cache_blob_name = "sleeper_weekly_stats/{year}/week_{week}.json"
+    # Weeks this close to the current one are fetched on every run, so late stat corrections land before a week is cached
+    weekly_stats_refetch_weeks = 3
+
+    # Number of ingest stages allowed to run at the same time
+    ingest_stage_workers = 4
+    # Fingerprints of each stage's fetched input at its last published run, a stage whose input matches
+    # skips parsing and uploading. SKIP_UNCHANGED_STAGES=false rebuilds everything (e.g. after a deploy)
+    stage_fingerprints_blob_name = "stage_fingerprints.json"
+    skip_unchanged_stages = os.getenv("SKIP_UNCHANGED_STAGES", "true").lower() == "true"
+
+    # Shared settings for the pooled HTTP fetcher used by the sleeper stats backfill
+    http_max_workers = 8
+    http_timeout_seconds = 20
+    http_retries = 3
+
+    # Tier pages loaded at once, and the per page content hashes + parsed tiers from the last scrape
+    borischen_max_pages = 4
+    borischen_page_cache_blob_name = "borischen_page_cache.json"
+
+    # Prop categories fetched at once, and the polite minimum gap between starting two requests
+    draftkings_max_concurrent_requests = 3
+    draftkings_min_request_interval_seconds = 0.5
+
+    # Fantasypros rankings are lazy loaded, scroll until this many rows exist or scrolling stops adding rows
+    fantasypros_rankings_target_rows = 325
+    fantasypros_scroll_wait_ms = 3000
+    fantasypros_stalled_scroll_limit = 2
+    fantasypros_rankings_timeout_seconds = 30
+
+    # "monte_carlo" samples each player's stats, "exact" convolves the stat distributions on a points grid
+    simulation_engine = os.getenv("SIMULATION_ENGINE", "monte_carlo")
+    simulation_count = 10000
+    exact_engine_grid_step = 0.01
+    # Players are sharded over this many processes, 1 simulates in process. Every player's draws are seeded
+    # from the run seed, so setting SIMULATION_SEED reproduces a run whatever the worker count
+    simulation_workers = int(os.getenv("SIMULATION_WORKERS", str(os.cpu_count() or 1)))
+    simulation_seed = int(os.getenv("SIMULATION_SEED")) if os.getenv("SIMULATION_SEED") else None
+    # Simulations store percentiles 1-100 as a list of quantile values, fewer knots are interpolated by readers
+    simulation_quantile_knots = int(os.getenv("SIMULATION_QUANTILE_KNOTS", "100"))
+    # Per player stat_probabilities hashes and Simulations of the last run, unchanged players are not simulated again
+    simulation_cache_blob_name = "simulation_cache.json"
+
+    # Sportsbook/fantasypros names are normalized to sleeper full names: names containing one of the
+    # suffixes are cut down to their first two words, then spellings sleeper uses differently are aliased
+    player_name_suffixes = ["Sr.", "Jr.", "III", "II"]
+    player_name_aliases = {
+        "DeVon Achane": "De'Von Achane",
+        "D.J. Moore": "DJ Moore",
+        "Lamar Jackson (BAL)": "Lamar Jackson",
+        "Gabriel Davis": "Gabe Davis",
+        "Demario Douglas": "DeMario Douglas",
+        "Scott Miller": "Scotty Miller",
+        "Andrew Ogletree": "Drew Ogletree",
+        "A.J. Barner": "AJ Barner",
+        "Patrick Mahomes II": "Patrick Mahomes",
+        "Marquise Brown": "Hollywood Brown",
+    }
+    name_resolver_cache_size = 4096
 
     boris_chen_fantasy_relevant_pos = ["K", "DEF", "DST", "QB", "TE", "WR", "RB", "Flex"]
     relevant_sleeper_keys = ["fantasy_positions", "full_name"]
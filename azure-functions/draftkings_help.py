@@ -1,15 +1,23 @@
 import requests
 import json
 import os
-import time
-import math
+import logging
 from config import Config
-from random import randint
 from bs4 import BeautifulSoup
 from azure.storage.blob import BlobServiceClient
-from collections import defaultdict
+from azure.core.exceptions import ResourceNotFoundError
+from blob_codec import decode_blob_payload, COMPRESSED_BLOB_SUFFIX
+from collections import defaultdict, Counter
 import numpy as np
-from playwright.sync_api import sync_playwright
+import asyncio
+from browser_pool import run_in_browser
+from functools import partial, lru_cache
+from simulation import simulate_players_parallel, simulate_changed_players, compact_stat_distributions
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 
 ## helper methods
@@ -18,146 +26,58 @@ def load_json_from_azure_storage(blob_name, container_name, connection_string):
     # Initialize the BlobServiceClient with the provided connection string
     blob_service_client = BlobServiceClient.from_connection_string(connection_string)
 
-    # Get the blob client
-    blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
+    # Download the blob content, preferring the compressed copy when there is one
+    blob_data = None
+    if Config.read_compressed_json_blobs:
+        try:
+            blob_data = blob_service_client.get_blob_client(container=container_name, blob=blob_name + COMPRESSED_BLOB_SUFFIX).download_blob()
+        except ResourceNotFoundError:
+            blob_data = None
+    if blob_data is None:
+        blob_data = blob_service_client.get_blob_client(container=container_name, blob=blob_name).download_blob()
 
-    # Download the blob content
-    blob_data = blob_client.download_blob()
-    data = json.loads(blob_data.readall())
+    data = decode_blob_payload(blob_data.readall())
 
     return data
 
+def load_players_index():
+    # Names and positions are all this module needs, so prefer the slim index over players.json
+    try:
+        return load_json_from_azure_storage(Config.players_index_blob_name, Config.containername, Config.azure_storage_connection_string)
+    except ResourceNotFoundError:
+        return load_json_from_azure_storage("players.json", Config.containername, Config.azure_storage_connection_string)
+
 def normalize_name_to_sleeper(name):
     #Normalize names to look like sleeper names
-    if "Sr." in name or "Jr." in name or "III" in name or "II" in name:
+    if any(suffix in name for suffix in Config.player_name_suffixes):
         name = " ".join(name.split()[:2])
-    if name == "DeVon Achane":
-        name = "De'Von Achane"
-    elif name == "D.J. Moore":
-        name = "DJ Moore"
-    elif name == "Lamar Jackson (BAL)":
-        name = "Lamar Jackson"
-    elif name == "Gabriel Davis":
-        name = "Gabe Davis"
-    elif name == "Demario Douglas":
-        name = "DeMario Douglas"
-    elif name == "Scott Miller":
-        name = "Scotty Miller"
-    elif name == "Andrew Ogletree":
-        name = "Drew Ogletree"
-    elif name == "A.J. Barner":
-        name = "AJ Barner"
-    elif name == "Patrick Mahomes II":
-        name = "Patrick Mahomes"
-    elif name == "Marquise Brown":
-        name = "Hollywood Brown"
-    return name
-
-def sample_from_ranges(ranges_probs, n_sims):
-    """Sample n_sims values from { (low, high): prob } ranges."""
-    ranges, probs = zip(*ranges_probs.items())
-    probs = np.array(probs) / np.sum(probs)
-    chosen_ranges = np.random.choice(len(ranges), size=n_sims, p=probs)
-
-    # For each chosen range, pick midpoint (or exact value if low==high)
-    values = []
-    for idx in chosen_ranges:
-        low, high = ranges[idx]
-        if low == high:
-            values.append(low)
-        elif np.isinf(high):
-            # Handle open-ended like (125, inf): use low*1.1 as approx
-            values.append(low * 1.1)
-        else:
-            values.append((low + high) / 2)
-    return np.array(values)
+    return Config.player_name_aliases.get(name, name)
 
-def run_player_sim(player_stats, n_sims=10000):
+class NameResolver:
     """
-    Run Monte Carlo sim for one player using stat_probabilities dict.
-    Returns boom/bust probabilities per scoring type, plus percentiles 1–100.
+    Resolves sportsbook player names to sleeper full names for one ingest run. Sleeper names are
+    held in a set, normalized names are memoized, and names without a sleeper match are counted
+    so they can be logged once with report_unresolved() instead of per selection.
     """
-    # --- Detect QB ---
-    is_qb = "Passing Yards" in player_stats or "Passing Touchdowns" in player_stats
-
-    # --- Sample stats ---
-    sims = { "Receptions": np.zeros(n_sims),
-             "Passing Yards": np.zeros(n_sims),
-             "Passing Touchdowns": np.zeros(n_sims),
-             "Interceptions": np.zeros(n_sims),
-             "Anytime Touchdown": np.zeros(n_sims),
-             "Receiving Yards": np.zeros(n_sims),
-             "Rushing Yards": np.zeros(n_sims) }
-
-    for stat, dist in player_stats.items():
-        sims[stat] = sample_from_ranges(dist, n_sims)
-
-    # --- Scoring ---
-    results = {}
-
-    if is_qb:
-        # Standard QB scoring (4pt pass TD)
-        std_points = (
-            sims["Passing Yards"] * 0.04 +  # 1 pt / 25 yd
-            sims["Passing Touchdowns"] * 4 +
-            sims["Interceptions"] * -2 +
-            sims["Rushing Yards"] * 0.1 +
-            sims["Receiving Yards"] * 0.1 +
-            sims["Anytime Touchdown"] * 6
-        )
-        # 6pt QB scoring
-        sixpt_points = (
-            sims["Passing Yards"] * 0.04 +
-            sims["Passing Touchdowns"] * 6 +
-            sims["Interceptions"] * -2 +
-            sims["Rushing Yards"] * 0.1 +
-            sims["Receiving Yards"] * 0.1 +
-            sims["Anytime Touchdown"] * 6
-        )
-
-        results["QB_STD"] = {
-            "boom": float(np.mean(std_points >= 30)),
-            "bust": float(np.mean(std_points <= 12)),
-            "mean": float(np.mean(std_points)),
-            "percentiles": {p: float(np.percentile(std_points, p)) for p in range(1, 101)}
-        }
-        results["QB_6PT"] = {
-            "boom": float(np.mean(sixpt_points >= 35)),
-            "bust": float(np.mean(sixpt_points <= 15)),
-            "mean": float(np.mean(sixpt_points)),
-            "percentiles": {p: float(np.percentile(sixpt_points, p)) for p in range(1, 101)}
-        }
 
-    else:
-        # Non-QB scoring
-        std_points = (
-            sims["Receiving Yards"] * 0.1 +
-            sims["Rushing Yards"] * 0.1 +
-            sims["Anytime Touchdown"] * 6
-        )
-        half_ppr = std_points + sims["Receptions"] * 0.5
-        ppr = std_points + sims["Receptions"] * 1.0
-
-        results["STD"] = {
-            "boom": float(np.mean(std_points > 18)),
-            "bust": float(np.mean(std_points < 5)),
-            "mean": float(np.mean(std_points)),
-            "percentiles": {p: float(np.percentile(std_points, p)) for p in range(1, 101)}
-        }
-        results["HalfPPR"] = {
-            "boom": float(np.mean(half_ppr > 22)),
-            "bust": float(np.mean(half_ppr < 6)),
-            "mean": float(np.mean(half_ppr)),
-            "percentiles": {p: float(np.percentile(half_ppr, p)) for p in range(1, 101)}
-        }
-        results["PPR"] = {
-            "boom": float(np.mean(ppr > 26)),
-            "bust": float(np.mean(ppr < 6)),
-            "mean": float(np.mean(ppr)),
-            "percentiles": {p: float(np.percentile(ppr, p)) for p in range(1, 101)}
-        }
-
-    return results
+    def __init__(self, sleeper_names):
+        self.sleeper_names = set(sleeper_names)
+        self.unresolved = Counter()
+        self._normalize = lru_cache(maxsize=Config.name_resolver_cache_size)(normalize_name_to_sleeper)
+
+    def resolve(self, name):
+        """The sleeper full name for name, or None when no sleeper player has it."""
+        normalized = self._normalize(name)
+        if normalized in self.sleeper_names:
+            return normalized
+        self.unresolved[normalized] += 1
+        return None
+
+    def report_unresolved(self):
+        if not self.unresolved:
+            return
+        summary = ", ".join(f"{name} ({count})" for name, count in self.unresolved.most_common())
+        logging.info(f"{len(self.unresolved)} names not found in the sleeper names we downloaded, with selection counts: {summary}")
 
 def odds_to_probability(odds):
     """
@@ -208,6 +128,12 @@ def expected_anytime_touchdown(odds_one_or_more, odds_two_or_more):
     
     return expected_touchdowns, exact_probs
 
+def odds_to_probabilities(odds):
+    """odds_to_probability for an array of American odds."""
+    odds = np.asarray(odds)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(odds > 0, 100 / (odds + 100), -odds / (-odds + 100))
+
 def over_under_projection(line, odds_over, odds_under, stat_type="generic"):
     """
     Calculate the projected number of some stat based on over/under odds,
@@ -216,166 +142,258 @@ def over_under_projection(line, odds_over, odds_under, stat_type="generic"):
     Returns:
         tuple: (projected_value: float, exact_probs: dict)
     """
-    # --- keep your original projected value logic ---
-    probability_over = odds_to_probability(odds_over)
-    probability_under = odds_to_probability(odds_under)
+    return over_under_projections([line], [odds_over], [odds_under], stat_type)[0]
+
+def over_under_projections(lines, odds_over, odds_under, stat_type="generic"):
+    """
+    over_under_projection for every player of a prop category at once. Takes equally long
+    sequences of lines and odds and returns a list of (projected_value, exact_probs).
+    """
+    if len(lines) == 0:
+        return []
+    lines = np.asarray(lines, dtype=float)
+    probability_over = odds_to_probabilities(odds_over)
+    probability_under = odds_to_probabilities(odds_under)
 
     total_probability = probability_over + probability_under
-    if total_probability == 0:
-        return None, {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normalized_prob_over = probability_over / total_probability
+        normalized_prob_under = probability_under / total_probability
 
-    normalized_prob_over = probability_over / total_probability
-    normalized_prob_under = probability_under / total_probability
+    lines_ceil = np.ceil(lines)
+    projected_values = normalized_prob_over * lines_ceil + normalized_prob_under * np.floor(lines)
 
-    projected_value = (
-        (normalized_prob_over * math.ceil(line))
-        + (normalized_prob_under * math.floor(line))
-    )
-
-    # --- build a distribution for exact_probs ---
+    # --- build a distribution for exact_probs, one row per player ---
     if stat_type == "interceptions":
-        max_val = 3  # interceptions capped at 3
+        max_vals = np.full(len(lines), 3)  # interceptions capped at 3
     elif stat_type == "receptions":
-        max_val = int(max(12, math.ceil(line) + 6))  # allow some upside
+        max_vals = np.maximum(12, lines_ceil + 6).astype(int)  # allow some upside
     else:
-        max_val = int(math.ceil(line) * 3)
+        max_vals = (lines_ceil * 3).astype(int)
 
-    values = np.arange(0, max_val + 1)
-    sigma = max(1.0, line * 0.3)  # variance grows with line
-    weights = np.exp(-0.5 * ((values - line) / sigma) ** 2)
+    values = np.arange(0, max_vals.max() + 1)
+    sigma = np.maximum(1.0, lines * 0.3)  # variance grows with line
+    weights = np.exp(-0.5 * ((values[None, :] - lines[:, None]) / sigma[:, None]) ** 2)
 
-    # Split into over/under halves
-    mask_over = values >= math.ceil(line)
-    mask_under = ~mask_over
+    # Split each row into over/under halves, ignoring values past that player's max_val
+    in_range = values[None, :] <= max_vals[:, None]
+    mask_over = (values[None, :] >= lines_ceil[:, None]) & in_range
+    mask_under = ~mask_over & in_range
 
     weights_over = weights * mask_over
     weights_under = weights * mask_under
 
-    if weights_over.sum() > 0:
-        weights_over *= normalized_prob_over / weights_over.sum()
-    if weights_under.sum() > 0:
-        weights_under *= normalized_prob_under / weights_under.sum()
+    over_sums = weights_over.sum(axis=1)
+    under_sums = weights_under.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights_over *= np.where(over_sums > 0, normalized_prob_over / over_sums, 1.0)[:, None]
+        weights_under *= np.where(under_sums > 0, normalized_prob_under / under_sums, 1.0)[:, None]
 
     weights = weights_over + weights_under
-    weights /= weights.sum()
-
-    exact_probs = {
-        (int(v), int(v)): float(p)
-        for v, p in zip(values, weights)
-        if p > 1e-6
-    }
-
-    return projected_value, exact_probs
-
-def calculate_exact_probs(lines, probabilities):
-    sorted_lines = sorted(lines)
-    exact_probs = {}
-
-    for i, line in enumerate(sorted_lines):
-        if i == len(sorted_lines)-1:
-            # Probability of exactly `line` events
-            exact_probs[line] = probabilities[line]  # Initial case
-        else:
-            # Probability of exactly `line` events
-            exact_probs[line] = probabilities[line] - probabilities[sorted_lines[i + 1]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights /= weights.sum(axis=1, keepdims=True)
 
-    return exact_probs
+    results = []
+    for row in range(len(lines)):
+        if total_probability[row] == 0:
+            results.append((None, {}))
+            continue
+        kept_values = np.flatnonzero(weights[row] > 1e-6)
+        exact_probs = {
+            (int(v), int(v)): float(p)
+            for v, p in zip(kept_values.tolist(), weights[row, kept_values].tolist())
+        }
+        results.append((float(projected_values[row]), exact_probs))
+    return results
 
 def devig_probability(prob: float, vig: float) -> float:
     """Remove the vig from the implied probability."""
     return prob / (1 + vig)
 
+def flatten_alt_lines(odds_dicts):
+    """
+    Flatten a prop category's per player {line: odds} dicts into (player index, line, odds)
+    arrays sorted by player and then line, plus each player's (start, end) slice into them.
+    """
+    player_index = np.repeat(np.arange(len(odds_dicts)), [len(odds_dict) for odds_dict in odds_dicts])
+    lines = np.array([line for odds_dict in odds_dicts for line in odds_dict])
+    odds = np.array([price for odds_dict in odds_dicts for price in odds_dict.values()])
+    order = np.lexsort((lines, player_index))
+    player_index, lines, odds = player_index[order], lines[order], odds[order]
+    bounds = np.searchsorted(player_index, np.arange(len(odds_dicts) + 1))
+    return player_index, lines, odds, list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
 def calculate_expected_tds(odds_dict: dict, vig: float) -> float:
     """Calculate the expected value given variable lines and vig."""
-    # Step 1: Convert odds to implied probabilities and remove vig
-    probabilities = {
-        line: devig_probability(odds_to_probability(odds), vig)
-        for line, odds in odds_dict.items()
-    }
+    return calculate_expected_tds_batch([odds_dict], vig)[0]
 
-    # Step 2: Calculate the probability of 0 touchdowns
-    p_0 = 1 - probabilities[min(probabilities)]  # 1+ is the minimum line
+def calculate_expected_tds_batch(odds_dicts, vig):
+    """calculate_expected_tds for every player's {line: odds} dict of a prop category at once."""
+    if len(odds_dicts) == 0:
+        return []
+    # Convert odds to implied probabilities and remove vig
+    player_index, lines, odds, slices = flatten_alt_lines(odds_dicts)
+    probabilities = devig_probability(odds_to_probabilities(odds), vig)
 
-    # Step 3: Calculate the exact probabilities for each outcome
-    exact_probs = calculate_exact_probs(list(odds_dict.keys()), probabilities)
+    # Probability of exactly `line` events is P(line+) - P(next line+), the top line keeps P(line+)
+    is_top_line = np.append(player_index[1:] != player_index[:-1], True)
+    exact = np.where(is_top_line, probabilities, probabilities - np.append(probabilities[1:], 0.0))
 
-    # Step 4: Calculate the expected value (EV) for touchdowns
-    expected_val = 0 * p_0  # Start with 0 TDs case
-    for line, prob in exact_probs.items():
-        expected_val += float(line) * float(prob)
+    # Expected value (EV) for touchdowns, the 0 TDs case adds nothing
+    expected_vals = np.bincount(player_index, weights=lines.astype(float) * exact, minlength=len(odds_dicts))
 
-    return expected_val, exact_probs
+    line_list, exact_list = lines.tolist(), exact.tolist()
+    return [
+        (float(expected_vals[i]), dict(zip(line_list[start:end], exact_list[start:end])))
+        for i, (start, end) in enumerate(slices)
+    ]
 
 def calculate_expected_yards(odds_dict, vig , name="default"):
     """Calculate expected yards using linear interpolation."""
-    # Step 1: Convert odds to probabilities and remove vig
-    probabilities = {
-        yards: devig_probability(odds_to_probability(odds), vig)
-        for yards, odds in odds_dict.items()
-    }
+    return calculate_expected_yards_batch([odds_dict], vig)[0]
 
-    # Step 2: Sort yardage lines in ascending order
-    sorted_yards = sorted(probabilities.keys())
-
-    # Step 3: Calculate exact probabilities for each range
-    exact_probs = {}
-    for i in range(len(sorted_yards) - 1):
-        lower = sorted_yards[i]
-        upper = sorted_yards[i + 1]
-        exact_probs[(lower, upper)] = probabilities[lower] - probabilities[upper]
-
-    # Add the probability for the highest range (e.g., 125+ yards)
-    exact_probs[(0, sorted_yards[0])] = 1 - probabilities[sorted_yards[0]]
-    exact_probs[(sorted_yards[-1], float('inf'))] = probabilities[sorted_yards[-1]]
-
-    # Step 4: Calculate expected value using interpolation
-    expected_yards = 0
-    for (lower, upper), prob in exact_probs.items():
-        # Use the midpoint for finite ranges, or a reasonable guess for infinite
-        if upper == float('inf'):
-            midpoint = float(lower) * 1.1
-        else:
-            midpoint = (float(lower) + float(upper)) / 2
-        expected_yards += prob * midpoint
-
-    return expected_yards, exact_probs
-
-def get_draftkings_data():
-    all_draftkings_odds = {}
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(viewport={"width": 1920, "height": 1080})
-        page = context.new_page()
-
-        for prop_name, mapping in Config.prop_name_to_ids_map.items():
-
-            stat_name = Config.prop_name_to_stat_name_map[prop_name]
-
-            if type(mapping) != int:
-                url = "https://sportsbook-nash.draftkings.com/api/sportscontent/dkusmi/v1/leagues/88808/categories/{}/subcategories/{}?format=json".format(mapping[0], mapping[1])
-            else:
-                url = "https://sportsbook-nash.draftkings.com/api/sportscontent/dkusmi/v1/leagues/88808/categories/{}?format=json".format(str(mapping))
-
-            page.goto(url)
-            page.wait_for_load_state("networkidle")
-            content = page.content()
-            body_text = page.inner_text("body")
+def calculate_expected_yards_batch(odds_dicts, vig):
+    """
+    calculate_expected_yards for every player's {yards: odds} dict of a prop category at once.
+    Each player's ranges are the gaps between consecutive lines, then (0, lowest line) and
+    (highest line, inf), and expected yards use range midpoints (lowest bound * 1.1 for the open range).
+    """
+    if len(odds_dicts) == 0:
+        return []
+    # Convert odds to probabilities and remove vig
+    player_index, yards, odds, slices = flatten_alt_lines(odds_dicts)
+    probabilities = devig_probability(odds_to_probabilities(odds), vig)
+    yard_list, probability_list = yards.tolist(), probabilities.tolist()
+
+    results = []
+    range_probs = []
+    midpoints = []
+    range_players = []
+    for i, (start, end) in enumerate(slices):
+        exact_probs = {}
+        for j in range(start, end - 1):
+            exact_probs[(yard_list[j], yard_list[j + 1])] = probability_list[j] - probability_list[j + 1]
+        exact_probs[(0, yard_list[start])] = 1 - probability_list[start]
+        exact_probs[(yard_list[end - 1], float('inf'))] = probability_list[end - 1]
+        results.append(exact_probs)
+
+        for (lower, upper), prob in exact_probs.items():
+            range_probs.append(prob)
+            midpoints.append(float(lower) * 1.1 if upper == float('inf') else (float(lower) + float(upper)) / 2)
+            range_players.append(i)
+
+    expected_yards = np.bincount(range_players, weights=np.array(range_probs) * np.array(midpoints), minlength=len(odds_dicts))
+    return [(float(expected_yards[i]), exact_probs) for i, exact_probs in enumerate(results)]
+
+class AsyncRateLimiter:
+    """Spaces out request starts by at least min_interval seconds across all coroutines on a loop."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_start = 0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next_start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = loop.time() + self.min_interval
+
+def get_draftkings_category_url(mapping):
+    if type(mapping) != int:
+        return "https://sportsbook-nash.draftkings.com/api/sportscontent/dkusmi/v1/leagues/88808/categories/{}/subcategories/{}?format=json".format(mapping[0], mapping[1])
+    return "https://sportsbook-nash.draftkings.com/api/sportscontent/dkusmi/v1/leagues/88808/categories/{}?format=json".format(str(mapping))
+
+def compact_selection(selection):
+    """The fields of a DraftKings selection the projections use, as (outcomeType, participant name, american odds, points, label)."""
+    participants = selection.get("participants")
+    return (
+        selection.get("outcomeType"),
+        participants[0].get("name") if participants else None,
+        (selection.get("displayOdds") or {}).get("american"),
+        selection.get("points"),
+        selection.get("label"),
+    )
 
+def extract_selections(body):
+    """
+    Compact selections of a category payload, leaving out selections without american odds. With
+    ijson the payload is parsed incrementally so only one selection object is built at a time
+    instead of the whole document.
+    """
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if ijson is None:
+        selections = json.loads(body).get("selections", [])
+    else:
+        selections = ijson.items(body, "selections.item", use_float=True)
+    compact_selections = (compact_selection(selection) for selection in selections)
+    return [selection for selection in compact_selections if selection[2] is not None]
+
+def american_odds_to_int(american_odds):
+    try:
+        return int(american_odds)
+    except ValueError:
+        # DraftKings uses a unicode minus sign for favorites
+        return -1 * int(american_odds[1:])
+
+def get_draftkings_data(browser_manager=None):
+    """
+    Compact selections (see compact_selection) of every prop category, keyed by stat name.
+    Each category is reduced as soon as its payload arrives, the raw payload is not kept.
+    """
+    categories = [
+        (Config.prop_name_to_stat_name_map[prop_name], get_draftkings_category_url(mapping))
+        for prop_name, mapping in Config.prop_name_to_ids_map.items()
+    ]
+
+    async def load_category_body(context, url):
+        # The request API shares the context's cookies without rendering anything, a full page
+        # load is only used when the sportsbook refuses the bare request
+        response = await context.request.get(url)
+        if response.ok:
+            return await response.body()
+        logging.info(f"Request for {url} returned {response.status}, retrying through a page")
+        page = await context.new_page()
+        try:
+            await page.goto(url)
+            await page.wait_for_load_state("networkidle")
+            return await page.inner_text("body")
+        finally:
+            await page.close()
+
+    async def load_categories(context):
+        semaphore = asyncio.Semaphore(Config.draftkings_max_concurrent_requests)
+        rate_limiter = AsyncRateLimiter(Config.draftkings_min_request_interval_seconds)
+
+        async def load_category(stat_name, url):
+            async with semaphore:
+                await rate_limiter.wait()
+                body = await load_category_body(context, url)
             try:
-                json_data = json.loads(body_text)
-            except json.JSONDecodeError as e:
-                print("Failed to parse JSON:")
+                return extract_selections(body)
+            except ValueError as e:
+                # json.JSONDecodeError and ijson.JSONError are both ValueErrors
+                print("Failed to parse JSON for " + stat_name + ":")
                 print(e)
-                continue
+                return None
 
-            all_draftkings_odds[stat_name] = json_data
+        return await asyncio.gather(*[load_category(stat_name, url) for stat_name, url in categories], return_exceptions=True)
 
-            time.sleep(randint(1,3))
+    selections_by_category = run_in_browser(browser_manager, load_categories, viewport={"width": 1920, "height": 1080})
 
-        browser.close()
+    all_draftkings_selections = {}
+    for (stat_name, url), selections in zip(categories, selections_by_category):
+        if isinstance(selections, Exception):
+            print("Failed to load " + stat_name + ": " + str(selections))
+            continue
+        if selections is None:
+            continue
+        all_draftkings_selections[stat_name] = selections
 
-    return all_draftkings_odds
+    return all_draftkings_selections
 
 def has_all_vegas_stats(stat_dict):
     has_all_stats = False
@@ -392,31 +410,30 @@ def has_all_vegas_stats(stat_dict):
         # tight end or WR
         has_all_stats = "Receiving Yards" in stat_dict and "Receptions" in stat_dict and "Anytime Touchdown" in stat_dict
     return has_all_stats, note
-def form_player_projections_dict():
-    all_draftkings_odds = get_draftkings_data()
-    players = load_json_from_azure_storage("players.json", Config.containername, Config.azure_storage_connection_string)
-    sleeper_names = [player_info["full_name"] for player_info in players.values() if "full_name" in player_info]
+def form_player_projections_dict(all_draftkings_selections, simulation_cache=None, players=None):
+    """
+    Expected stats plus Simulations for every player in the selections from get_draftkings_data,
+    and the compact stat distributions the backend rescores per league. simulation_cache, when given,
+    is the previous run's simulation cache and is updated in place (see simulation.simulate_changed_players).
+    players is the sleeper players index used to resolve names, loaded here when not given.
+    """
+    if players is None:
+        players = load_players_index()
+    name_resolver = NameResolver(player_info["full_name"] for player_info in players.values() if "full_name" in player_info)
 
     expected_stats = defaultdict(dict)
     stat_probabilities = defaultdict(dict)
     
-    for stat_name, data in all_draftkings_odds.items():
+    for stat_name, selections in all_draftkings_selections.items():
         if stat_name == "Anytime Touchdown":
             td_odds_dict = defaultdict(dict)
-            for odds_information in data["selections"]:
-                outcome = odds_information["outcomeType"]
-                if outcome not in Config.relevant_td_outcomes or "participants" not in odds_information:
+            for outcome, participant, american_odds, points, label in selections:
+                if outcome not in Config.relevant_td_outcomes or participant is None:
                     continue
-                name = normalize_name_to_sleeper(odds_information["participants"][0]["name"])
-
-                if name not in sleeper_names:
-                    print(name + " is not found in the list of sleeper names that we have downloaded")
+                name = name_resolver.resolve(participant)
+                if name is None:
                     continue
-                american_odds = odds_information["displayOdds"]["american"]
-                try:
-                    odds_as_int = int(american_odds)
-                except ValueError:
-                    odds_as_int = -1 * int(american_odds[1:])
+                odds_as_int = american_odds_to_int(american_odds)
                 if "2" in outcome:
                     td_odds_dict[name]["twoplus"] = odds_as_int
                 else:
@@ -432,58 +449,78 @@ def form_player_projections_dict():
 
             lines_and_odds = defaultdict(dict)
 
-            for odds_information in data["selections"]:
-                over_yards = int(odds_information["label"].replace("+", ""))
-                name = normalize_name_to_sleeper(odds_information["participants"][0]["name"])
-                if name not in sleeper_names:
-                    print(name + " is not found in the list of sleeper names that we have downloaded")
+            for outcome, participant, american_odds, points, label in selections:
+                if participant is None:
+                    continue
+                over_yards = int(label.replace("+", ""))
+                name = name_resolver.resolve(participant)
+                if name is None:
                     continue
-                american_odds = odds_information["displayOdds"]["american"]
-                try:
-                    odds_as_int = int(american_odds)
-                except ValueError:
-                    odds_as_int = -1 * int(american_odds[1:])
-                lines_and_odds[name][over_yards] = odds_as_int
+                lines_and_odds[name][over_yards] = american_odds_to_int(american_odds)
             
-            for name, odds_dict in lines_and_odds.items():
-                lowercase_name = ''.join(char for char in name if char.isalnum()).lower()
+            # The whole category is converted at once
+            names = list(lines_and_odds)
+            odds_dicts = [lines_and_odds[name] for name in names]
+            if td_flag:
+                projections = calculate_expected_tds_batch(odds_dicts, 0.071)
+            else:
+                projections = calculate_expected_yards_batch(odds_dicts, 0.071)
 
-                if td_flag:
-                    expected_stats[lowercase_name][stat_name], stat_probabilities[lowercase_name][stat_name] = calculate_expected_tds(odds_dict, 0.071)
-                else:
-                    expected_stats[lowercase_name][stat_name], stat_probabilities[lowercase_name][stat_name] = calculate_expected_yards(odds_dict, 0.071, "default" if name != "Malik Nabers" else name)    
+            for name, projection in zip(names, projections):
+                lowercase_name = ''.join(char for char in name if char.isalnum()).lower()
+                expected_stats[lowercase_name][stat_name], stat_probabilities[lowercase_name][stat_name] = projection
         else:
             temp_dict = defaultdict(dict)
-            for odds_information in data["selections"]:
-                outcome = odds_information["outcomeType"]
-                if (outcome != "Over" and outcome != "Under") or "participants" not in odds_information:
-                    print("Unexpected outcome " + outcome + " or lack of participants here.  Skipping!" )
+            for outcome, participant, american_odds, points, label in selections:
+                if (outcome != "Over" and outcome != "Under") or participant is None:
+                    print("Unexpected outcome " + str(outcome) + " or lack of participants here.  Skipping!" )
                     continue
-                name = normalize_name_to_sleeper(odds_information["participants"][0]["name"])
-                if name not in sleeper_names:
-                    print(name + " is not found in the list of sleeper names that we have downloaded")
+                name = name_resolver.resolve(participant)
+                if name is None:
                     continue
-                american_odds = odds_information["displayOdds"]["american"]
-                try:
-                    odds_as_int = int(american_odds)
-                except ValueError:
-                    odds_as_int = -1 * int(american_odds[1:])
-                temp_dict[name][outcome] = odds_as_int
-                temp_dict[name]["Line"] = float(odds_information["points"]) 
-
-            for name, p_odds_dict in temp_dict.items():
+                temp_dict[name][outcome] = american_odds_to_int(american_odds)
+                temp_dict[name]["Line"] = float(points) 
+
+            names = list(temp_dict)
+            projections = over_under_projections(
+                lines=[temp_dict[name]["Line"] for name in names],
+                odds_over=[temp_dict[name]["Over"] for name in names],
+                odds_under=[temp_dict[name]["Under"] for name in names],
+            )
+            for name, projection in zip(names, projections):
                 lowercase_name = ''.join(char for char in name if char.isalnum()).lower()
-                expected_stats[lowercase_name][stat_name], stat_probabilities[lowercase_name][stat_name] = over_under_projection(line=p_odds_dict["Line"], odds_over=p_odds_dict["Over"], odds_under=p_odds_dict["Under"])
+                expected_stats[lowercase_name][stat_name], stat_probabilities[lowercase_name][stat_name] = projection
+    name_resolver.report_unresolved()
+
+    simulation_inputs = {}
     for player, stats in stat_probabilities.items():
         has_all_stats, note = has_all_vegas_stats(stats)
         if not has_all_stats:  # skip if no props
             expected_stats[player]["Simulations"] = {"error": "Not enough data"}
             continue
-        try:
-            expected_stats[player]["Simulations"] = run_player_sim(stats, n_sims=10000)
-        except Exception as e:
-            expected_stats[player]["Simulations"] = {"error": str(e)}
-    return expected_stats
+        simulation_inputs[player] = stats
+
+    # Players are simulated in batches sharded over worker processes, per player failures come back as {"error": ...}
+    run_seed = Config.simulation_seed if Config.simulation_seed is not None else np.random.SeedSequence().entropy
+    logging.info(f"Simulation run seed {run_seed}, {Config.simulation_workers} workers")
+    simulate = partial(
+        simulate_players_parallel,
+        engine=Config.simulation_engine,
+        n_sims=Config.simulation_count,
+        grid_step=Config.exact_engine_grid_step,
+        run_seed=run_seed,
+        workers=Config.simulation_workers,
+        quantile_knots=Config.simulation_quantile_knots,
+    )
+    if simulation_cache is not None:
+        # Only players whose odds moved since the last run are simulated again
+        settings_key = f"{Config.simulation_engine}:{Config.simulation_count}:{Config.exact_engine_grid_step}:{Config.simulation_quantile_knots}"
+        simulations_by_player = simulate_changed_players(simulation_inputs, simulation_cache, settings_key, simulate)
+    else:
+        simulations_by_player = simulate(simulation_inputs)
+    for player, simulations in simulations_by_player.items():
+        expected_stats[player]["Simulations"] = simulations
+    return expected_stats, compact_stat_distributions(simulation_inputs)
 
                     
 
@@ -2,39 +2,156 @@ import azure.functions as func
 import os
 import json
 import requests
-from random import randint, choice
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup
+import asyncio
+from functools import partial
+from bs4 import BeautifulSoup, SoupStrainer
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from config import Config
 import logging
-import time
+import hashlib
 from datetime import datetime
 from collections import defaultdict
 from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
-from draftkings_help import form_player_projections_dict, normalize_name_to_sleeper
+from azure.core.exceptions import ResourceNotFoundError
+from draftkings_help import form_player_projections_dict, get_draftkings_data, normalize_name_to_sleeper, load_json_from_azure_storage, load_players_index
+from projection_store import build_projection_store
+from blob_codec import encode_compressed_json, COMPRESSED_BLOB_SUFFIX
+from stage_runner import Stage, run_stages, input_fingerprint, check_unchanged, StageUnchanged
+from browser_pool import BrowserManager, run_in_browser
+from table_extractor import extract_projection_table
 import pytz
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import lxml
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
 
 app = func.FunctionApp()
 
-def load_json_from_url(url):
-    response = requests.get(url=url)
+def load_json_from_url(url, session=None):
+    response = (session or requests).get(url=url, timeout=Config.http_timeout_seconds)
+    response.raise_for_status()
     return response.json()
 
+def create_http_session(pool_size=Config.http_max_workers):
+    # Pooled keep-alive connections, retrying throttled and transient server errors with backoff
+    retry = Retry(
+        total=Config.http_retries,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"]
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def load_text_from_url(url, session=None):
+    response = (session or requests).get(url=url, timeout=Config.http_timeout_seconds)
+    response.raise_for_status()
+    return response.text
+
+def load_json_from_urls(urls, max_workers=Config.http_max_workers):
+    """Fetch every url with a bounded number of concurrent requests, results are returned in url order."""
+    return load_from_urls(urls, load_json_from_url, max_workers)
+
+def load_texts_from_urls(urls, max_workers=Config.http_max_workers):
+    return load_from_urls(urls, load_text_from_url, max_workers)
+
+def load_from_urls(urls, loader, max_workers=Config.http_max_workers):
+    with create_http_session(max_workers) as session:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda url: loader(url, session), urls))
+
 def upload_to_azure_blob(data_dict, blob_name, filename="file"):
+    # Both formats are written while readers move over to the compressed one. Readers prefer the compressed copy,
+    # so it goes up first: a failed upload can leave the plain blob behind it, never ahead of it
+    if Config.write_compressed_json_blobs:
+        upload_bytes_to_azure_blob(encode_compressed_json(data_dict), blob_name + COMPRESSED_BLOB_SUFFIX, filename)
+    else:
+        delete_azure_blob(blob_name + COMPRESSED_BLOB_SUFFIX)
+
+    if Config.write_plain_json_blobs:
+        # Convert the dictionary to JSON
+        json_data = json.dumps(data_dict)
+        upload_bytes_to_azure_blob(json_data, blob_name, filename)
+
+def get_azure_blob_client(blob_name, **client_options):
     connect_str = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
     if not connect_str:
         raise ValueError("AZURE_STORAGE_CONNECTION_STRING environment variable not set.")
+    blob_service_client = BlobServiceClient.from_connection_string(connect_str, **client_options)
+    return blob_service_client.get_blob_client(container=Config.container_name, blob=blob_name)
 
-    blob_service_client = BlobServiceClient.from_connection_string(connect_str)
-    container_name = Config.container_name  # Make sure this is defined in your config
-    blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
+def delete_azure_blob(blob_name):
+    try:
+        get_azure_blob_client(blob_name).delete_blob()
+        logging.info(f"Deleted {blob_name} from Azure Blob Storage.")
+    except ResourceNotFoundError:
+        pass
+
+def upload_bytes_to_azure_blob(payload, blob_name, filename="file"):
+
+    # Payloads over max_single_put_size go up as blocks, max_concurrency of them at a time
+    blob_client = get_azure_blob_client(
+        blob_name,
+        max_single_put_size=Config.blob_upload_single_put_bytes,
+        max_block_size=Config.blob_upload_block_bytes,
+    )
 
-    # Convert the dictionary to JSON
-    json_data = json.dumps(data_dict)
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    content_hash = hashlib.sha256(payload).hexdigest()
 
-    blob_client.upload_blob(json_data, overwrite=True)
+    # Re-uploading identical content would still change the blob's ETag and invalidate every reader's cache
+    try:
+        existing_hash = blob_client.get_blob_properties().metadata.get(Config.blob_content_hash_metadata_key)
+    except ResourceNotFoundError:
+        existing_hash = None
+    if existing_hash == content_hash:
+        logging.info(f"{filename} unchanged, kept the existing {blob_name}.")
+        return False
+
+    blob_client.upload_blob(
+        payload,
+        overwrite=True,
+        metadata={Config.blob_content_hash_metadata_key: content_hash},
+        max_concurrency=Config.blob_upload_max_concurrency,
+    )
 
     logging.info(f"Uploaded {filename} to Azure Blob Storage as {blob_name}.")
+    return True
+
+def is_complete_weekly_stats(week_stats, positions):
+    return all(week_stats.get(position) for position in positions)
+
+def load_cached_weekly_stats(year, weeks, positions):
+    """
+    Per-position stats of already completed weeks, keyed by week. Weeks without a cached blob, or
+    with a position missing from it, are left out so they are fetched again.
+    """
+    def load_week(week):
+        try:
+            return load_json_from_azure_storage(Config.weekly_stats_cache_blob_name.format(year=year, week=week), Config.containername, Config.azure_storage_connection_string)
+        except ResourceNotFoundError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=Config.http_max_workers) as executor:
+        cached = dict(zip(weeks, executor.map(load_week, weeks)))
+
+    cached = {week: stats for week, stats in cached.items() if stats is not None and is_complete_weekly_stats(stats, positions)}
+    logging.info(f"Loaded cached weekly stats for {len(cached)} of {len(weeks)} completed weeks")
+    return cached
 
 def get_current_nfl_week(season_start_year=2025):
     # Approximate NFL season start (Thursday of Week 1)
@@ -62,19 +179,30 @@ def get_sleeper_owned_for_week():
 
     return True
 
-def get_sleeper_player_data():
-    url = "https://api.sleeper.app/v1/players/nfl"
-    resp = requests.get(url=url)
-    data = resp.json()
-
-    for pid in dict(data):
-        if data[pid]["fantasy_positions"] and len(set(data[pid]["fantasy_positions"]).intersection(set(Config.boris_chen_fantasy_relevant_pos))) == 0:
-            del data[pid]
+def filter_relevant_sleeper_players(player_items):
+    """Keep players at relevant positions (or without positions), trimmed to Config.relevant_sleeper_keys."""
+    relevant_positions = set(Config.boris_chen_fantasy_relevant_pos)
+    players = {}
+    for pid, player in player_items:
+        positions = player.get("fantasy_positions")
+        if positions and len(relevant_positions.intersection(positions)) == 0:
             continue
+        players[pid] = {key: player[key] for key in Config.relevant_sleeper_keys if key in player}
+    return players
 
-        for key in dict(data[pid]):
-            if key not in Config.relevant_sleeper_keys:
-                del data[pid][key]
+def load_relevant_sleeper_players(url):
+    if ijson is None:
+        return filter_relevant_sleeper_players(load_json_from_url(url).items())
+
+    # Parse the dump incrementally so only one full player record is held at a time
+    with requests.get(url=url, stream=True, timeout=Config.http_timeout_seconds) as resp:
+        resp.raise_for_status()
+        resp.raw.decode_content = True
+        return filter_relevant_sleeper_players(ijson.kvitems(resp.raw, "", use_float=True))
+
+def get_sleeper_player_data():
+    url = "https://api.sleeper.app/v1/players/nfl"
+    data = load_relevant_sleeper_players(url)
 
     # update with positional rankings, scoring data, etc
 
@@ -97,17 +225,47 @@ def get_sleeper_player_data():
     season_scoring = defaultdict(dict)
     weekly_scoring = defaultdict(lambda: defaultdict(dict))
 
-    for position, num_desired in positions.items():
-        temp_position_season_scoring = load_json_from_url(f"https://api.sleeper.com/stats/nfl/{str(year)}?season_type=regular&position={position}&order_by=pts_half_ppr")
+    season_urls = [
+        f"https://api.sleeper.com/stats/nfl/{str(year)}?season_type=regular&position={position}&order_by=pts_half_ppr"
+        for position in positions
+    ]
+
+    # Completed weeks never change, so they are read from their cached blobs and only the last
+    # weekly_stats_refetch_weeks weeks (plus anything missing from the cache) are fetched
+    current_week = get_current_nfl_week(year)
+    weeks = [week for week in range(1, playoff_start_week) if week <= current_week]
+    completed_weeks = [week for week in weeks if week <= current_week - Config.weekly_stats_refetch_weeks]
+    weekly_stats = load_cached_weekly_stats(year, completed_weeks, positions)
+
+    weekly_requests = [(week, position) for week in weeks if week not in weekly_stats for position in positions]
+    weekly_urls = [
+        f"https://api.sleeper.com/stats/nfl/{str(year)}/{str(week)}?season_type=regular&position={position}&order_by=pts_half_ppr"
+        for week, position in weekly_requests
+    ]
+    responses = load_json_from_urls(season_urls + weekly_urls)
+    season_responses = responses[:len(season_urls)]
+    weekly_responses = responses[len(season_urls):]
+
+    for (week, position), temp_week_position_scoring in zip(weekly_requests, weekly_responses):
+        weekly_stats.setdefault(week, {})[position] = temp_week_position_scoring[:positions[position][1]]
+
+    # An empty position usually means sleeper had not published the week yet, so it is fetched again next run
+    for week in sorted({week for week, _ in weekly_requests if week in completed_weeks}):
+        if is_complete_weekly_stats(weekly_stats[week], positions):
+            upload_to_azure_blob(weekly_stats[week], Config.weekly_stats_cache_blob_name.format(year=year, week=week))
+        else:
+            logging.warning(f"Not caching week {week} stats, some positions came back empty")
+
+    # Merge in week then position order so the output matches a sequential fetch
+    for (position, num_desired), temp_position_season_scoring in zip(positions.items(), season_responses):
         season_scoring.update({
             temp_dict["player_id"]: temp_dict["stats"]
             for temp_dict in temp_position_season_scoring[:num_desired[0]]
         })
 
-    for week in range(1, playoff_start_week):
-        for position, num_desired in positions.items():
-            temp_week_position_scoring = load_json_from_url(f"https://api.sleeper.com/stats/nfl/{str(year)}/{str(week)}?season_type=regular&position={position}&order_by=pts_half_ppr")
-            for stats in temp_week_position_scoring[:num_desired[1]]:
+    for week in weeks:
+        for position in positions:
+            for stats in weekly_stats[week].get(position, []):
                 player_id = stats["player_id"]
                 weekly_scoring[player_id][week] = stats["stats"]
 
@@ -157,20 +315,30 @@ def get_sleeper_player_data():
             "6pt_pass_td_points": qb[1]
         })
 
-    upload_to_azure_blob(players_dict, "players.json")
+    if Config.write_monolithic_players_blob:
+        upload_to_azure_blob(players_dict, "players.json")
+    upload_partitioned_players(players_dict)
 
     return True
 
-def retrieve_tiers_from_soup(soup):
-    object_tag = soup.find('object', {"type": "text/html"})
-    if object_tag:
-        data_value = object_tag.get('data')
-        if data_value:
-            data_response = requests.get(data_value)
-            data_response.raise_for_status()
-            return data_response.text
-    else:
-        logging.info("No object tag")
+def upload_partitioned_players(players_dict):
+    # Slim identity index for the request path, scoring details split into per-position shards
+    players_index = {}
+    detail_shards = defaultdict(dict)
+    for pid, info in players_dict.items():
+        index_entry = {key: info[key] for key in Config.relevant_sleeper_keys if key in info}
+        if "scoring_data_season" in info:
+            shard = info["fantasy_positions"][0] if info.get("fantasy_positions") else "UNKNOWN"
+            index_entry["detail_shard"] = shard
+            detail_shards[shard][pid] = {
+                "scoring_data_weekly": info["scoring_data_weekly"],
+                "scoring_data_season": info["scoring_data_season"]
+            }
+        players_index[pid] = index_entry
+
+    upload_to_azure_blob(players_index, Config.players_index_blob_name)
+    for shard, details in detail_shards.items():
+        upload_to_azure_blob(details, Config.player_detail_blob_name.format(shard))
 
 def split_text_into_tier_dict(text):
     lines = str(text).split("\n")
@@ -180,7 +348,7 @@ def split_text_into_tier_dict(text):
     tiers.remove([""])
     return tiers
 
-def get_boris_chen_tiers():
+def get_boris_chen_tiers(browser_manager=None, stage_fingerprints=None):
     logging.info("Starting borischen scrape method")
     url = 'http://borischen.co'
     response = requests.get(url)
@@ -209,68 +377,86 @@ def get_boris_chen_tiers():
 
     logging.info("Got borischen links")
 
-    # Start Playwright session
+    # Each tier page only embeds the tier text through an <object> tag, so the pages are
+    # loaded concurrently just to find those urls
+    semaphore = asyncio.Semaphore(Config.borischen_max_pages)
+
+    async def load_tier_data_url(context, link):
+        async with semaphore:
+            logging.info(f"Getting data from link {link}")
+            page = await context.new_page()
+            try:
+                await page.goto(link)
+                object_tag = await page.query_selector('object[type="text/html"]')
+                if object_tag is None:
+                    logging.info("No object tag")
+                    return None
+                return await object_tag.get_attribute('data')
+            finally:
+                await page.close()
+
+    async def load_tier_data_urls(context):
+        return await asyncio.gather(*[load_tier_data_url(context, link) for link, name in links])
+
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-
-            tiers = {}
-            for link, name in links:
-                logging.info(f"Getting data from link {link}")
-                page.goto(link)
-
-                # Use BeautifulSoup to parse the page content
-                soup = BeautifulSoup(page.content(), 'html.parser')
-                text_tier = retrieve_tiers_from_soup(soup)
-                tier_lines = split_text_into_tier_dict(text_tier)
-                tier_dict = {}
-                def fix_hollywood_brown(p_name):
-                    if p_name == "Marquise Brown":
-                        return "Hollywood Brown"
-                    return p_name
-                for num, tier in enumerate(tier_lines):
-                    tier_dict[num + 1] = [fix_hollywood_brown(player.strip()) for player in tier]
-                tiers[name] = tier_dict
-
-            browser.close()
+        data_urls = run_in_browser(browser_manager, load_tier_data_urls)
     except Exception as e:
         logging.info("Playwright failed")
         raise ValueError("Playwright not installed correctly")
 
-    upload_to_azure_blob(tiers, "borischen_tiers.json")
+    urls_to_fetch = [data_url for data_url in data_urls if data_url]
+    texts_by_url = dict(zip(urls_to_fetch, load_texts_from_urls(urls_to_fetch)))
+    tier_texts = [texts_by_url.get(data_url) for data_url in data_urls]
 
-    return {'message': 'Tiers scraped and saved successfully.', 'tiers': tiers}
+    fingerprint = input_fingerprint([name for link, name in links], tier_texts)
+    check_unchanged(stage_fingerprints, "borischen", fingerprint)
 
-# helper functions
-def get_fantasypros_top_players():
-
-    logging.info("Starting fantasypros scrape!")
-
-    url = "https://www.fantasypros.com/nfl/rankings/half-point-ppr-superflex.php"
-
-    flex_stats_url = "https://www.fantasypros.com/nfl/projections/flex.php?scoring=HALF"
-    qb_stats_url = "https://www.fantasypros.com/nfl/projections/qb.php" 
-    #TODO - pull down this data to use as backup when calculating scores
-    #TODO - list top free agent pickups for each position based on vegas scores
-
-    columnToStatNameDict = {}
-    fantasy_pros_projections = {}
+    def fix_hollywood_brown(p_name):
+        if p_name == "Marquise Brown":
+            return "Hollywood Brown"
+        return p_name
 
-    # Get flex rankings
-    response = requests.get(flex_stats_url)
-    html_content = response.text
+    # Pages whose tier text hashes the same as last run reuse the tiers parsed back then
+    try:
+        previous_pages = load_json_from_azure_storage(Config.borischen_page_cache_blob_name, Config.containername, Config.azure_storage_connection_string)
+    except ResourceNotFoundError:
+        previous_pages = {}
+
+    tiers = {}
+    pages = {}
+    changed_pages = []
+    for (link, name), text_tier in zip(links, tier_texts):
+        content_hash = hashlib.sha256(str(text_tier).encode("utf-8")).hexdigest()
+        if name in previous_pages and previous_pages[name]["hash"] == content_hash:
+            tier_dict = previous_pages[name]["tiers"]
+        else:
+            changed_pages.append(name)
+            tier_lines = split_text_into_tier_dict(text_tier)
+            tier_dict = {}
+            for num, tier in enumerate(tier_lines):
+                tier_dict[num + 1] = [fix_hollywood_brown(player.strip()) for player in tier]
+        tiers[name] = tier_dict
+        pages[name] = {"hash": content_hash, "tiers": tier_dict}
+
+    if not changed_pages and set(pages) == set(previous_pages):
+        logging.info("No borischen tier pages changed, keeping the published tiers")
+        if stage_fingerprints is not None:
+            stage_fingerprints["borischen"] = fingerprint
+        raise StageUnchanged("No tier pages changed")
+
+    logging.info(f"Borischen tier pages changed: {changed_pages}")
+    upload_to_azure_blob(tiers, "borischen_tiers.json")
+    upload_to_azure_blob(pages, Config.borischen_page_cache_blob_name)
+    if stage_fingerprints is not None:
+        stage_fingerprints["borischen"] = fingerprint
 
-    soup = BeautifulSoup(html_content, 'html.parser')
+    return {'message': 'Tiers scraped and saved successfully.', 'tiers': tiers}
 
-    # Retrieve the page content and parse it with BeautifulSoup
+def name_flex_projection_columns(headers):
+    """Map flex projection stat cells to stat names, the first two columns are not td.center cells."""
+    column_to_stat_name = {}
     receiving_flag = False
-
-    # Scrape column headers for the table
-    headers = soup.select('thead tr:nth-of-type(2) th') 
-    for idx, header in enumerate(headers):
-        stat_name = header.find('small').text if header.find('small') else ""
-        
+    for idx, stat_name in enumerate(headers):
         # Skip "POS" column
         if stat_name == "POS":
             continue
@@ -286,79 +472,58 @@ def get_fantasypros_top_players():
             else:
                 stat_name = "RUSH_" + stat_name
 
-        columnToStatNameDict[idx] = stat_name
+        if stat_name and idx >= 2:
+            column_to_stat_name[idx - 2] = stat_name
 
         # Stop processing at "FPTS"
         if stat_name == "FPTS":
             break
+    return column_to_stat_name
 
-    # Process each player in the table
-    player_rows = soup.select('tbody tr[class^="mpb-player-"]')
-    for player_row in player_rows:
-        # Get player's name
-        player_name = normalize_name_to_sleeper(player_row.select_one('.player-name').text.strip())
-
-        # Initialize a temporary dictionary to hold the player's stats
-        temp_stat_dict = {}
-        stat_elements = player_row.select('td.center')
-
-        # Iterate over each <td> element, adding its text to the temp_stat_dict
-        for index, stat_element in enumerate(stat_elements):
-            stat_name = columnToStatNameDict.get(index + 2)  # Use the dictionary for stat names
-            if stat_name:
-                stat_value = stat_element.text.strip()
-                temp_stat_dict[stat_name] = stat_value
-
-        # Add the player's stats to the main projections dictionary
-        fantasy_pros_projections[player_name] = temp_stat_dict
-
-    #get qb stats
-    columnToStatNameDict = {}
-    response = requests.get(qb_stats_url)
-    html_content = response.text
-
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Retrieve the page content and parse it with BeautifulSoup
-    # Scrape column headers for the table
-    headers = soup.select('thead tr:nth-of-type(2) th') 
+def name_qb_projection_columns(headers):
+    """Map QB projection stat cells to stat names, only the player column is not a td.center cell."""
+    column_to_stat_name = {}
     rushing_flag = False
-
-    for idx, header in enumerate(headers):
-        data_column = idx
-        stat_name = header.find('small').text if header.find('small') else ""
-        
+    for idx, stat_name in enumerate(headers):
         if stat_name == "YDS" or stat_name == "TDS":
             if rushing_flag:
                 stat_name = "RUSH_" + stat_name
             else:
                 stat_name = "PASS_" + stat_name
 
-        columnToStatNameDict[int(data_column)-1] = stat_name
+        if stat_name and idx >= 1:
+            column_to_stat_name[idx - 1] = stat_name
         if stat_name == "INTS":
             rushing_flag = True
         if stat_name == "FPTS":
             break
+    return column_to_stat_name
+
+# helper functions
+def get_fantasypros_top_players(browser_manager=None):
 
-    # Process each player in the table
-    player_rows = soup.select('tbody tr[class^="mpb-player-"]')
-    for player_row in player_rows:
-        # Get player's name
-        player_name = normalize_name_to_sleeper(player_row.select_one('.player-name').text.strip())
+    logging.info("Starting fantasypros scrape!")
+
+    url = "https://www.fantasypros.com/nfl/rankings/half-point-ppr-superflex.php"
+
+    flex_stats_url = "https://www.fantasypros.com/nfl/projections/flex.php?scoring=HALF"
+    qb_stats_url = "https://www.fantasypros.com/nfl/projections/qb.php" 
+    #TODO - pull down this data to use as backup when calculating scores
+    #TODO - list top free agent pickups for each position based on vegas scores
 
-        # Initialize a temporary dictionary to hold the player's stats
-        temp_stat_dict = {}
-        stat_elements = player_row.select('td.center')
+    fantasy_pros_projections = {}
 
-        # Iterate over each <td> element, adding its text to the temp_stat_dict
-        for index, stat_element in enumerate(stat_elements):
-            stat_name = columnToStatNameDict.get(index)  # Use the dictionary for stat names
-            if stat_name:
-                stat_value = stat_element.text.strip()
-                temp_stat_dict[stat_name] = stat_value
+    # Get flex rankings
+    response = requests.get(flex_stats_url)
+    flex_projections = extract_projection_table(response.text, name_flex_projection_columns)
 
+    #get qb stats
+    response = requests.get(qb_stats_url)
+    qb_projections = extract_projection_table(response.text, name_qb_projection_columns)
+
+    for player_name, temp_stat_dict in list(flex_projections.items()) + list(qb_projections.items()):
         # Add the player's stats to the main projections dictionary
-        fantasy_pros_projections[player_name] = temp_stat_dict
+        fantasy_pros_projections[normalize_name_to_sleeper(player_name)] = temp_stat_dict
 
     #Transform the fantasypros data into the way we expect the data from sportsbook since it is our backup
     backup_fantasypros_data = {}
@@ -376,23 +541,41 @@ def get_fantasypros_top_players():
     upload_to_azure_blob(backup_fantasypros_data, "backup_fantasypros_projections.json")
 
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+    async def load_rankings_table(context):
+        page = await context.new_page()
         # Get overall ranking data etc
-        page.goto(url)
+        await page.goto(url)
+        await page.wait_for_selector("tr.player-row", timeout=Config.fantasypros_rankings_timeout_seconds * 1000)
+
+        # Rows are lazy loaded as the page scrolls, keep pressing End until every ranked
+        # player is there or no new rows show up, rather than sleeping a fixed amount
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + Config.fantasypros_rankings_timeout_seconds
+        target_rows = Config.fantasypros_rankings_target_rows
+        row_count = await page.locator("tr.player-row").count()
+        stalled_scrolls = 0
+        while row_count < target_rows and stalled_scrolls < Config.fantasypros_stalled_scroll_limit and loop.time() < deadline:
+            await page.keyboard.press('End')
+            try:
+                await page.wait_for_function(
+                    "([previous, target]) => { const rows = document.querySelectorAll('tr.player-row').length; return rows > previous || rows >= target; }",
+                    arg=[row_count, target_rows],
+                    timeout=Config.fantasypros_scroll_wait_ms
+                )
+                stalled_scrolls = 0
+            except PlaywrightTimeoutError:
+                stalled_scrolls += 1
+            row_count = await page.locator("tr.player-row").count()
 
-        # Scroll the page down multiple times to fully load all players
-        for _ in range(5):
-            page.keyboard.press('End')
-            time.sleep(2)
+        logging.info(f"Fantasypros rankings loaded {row_count} rows")
 
-        # Once all content is loaded, grab the page source
-        html = page.content()
-        browser.close()
+        # Only the rankings table is needed, not the rest of the page
+        return await page.evaluate("() => document.querySelector('tr.player-row').closest('table').outerHTML")
 
-    # Parse the HTML with BeautifulSoup
-    soup = BeautifulSoup(html, 'html.parser')
+    html = run_in_browser(browser_manager, load_rankings_table)
+
+    # Parse just the player rows of the table with BeautifulSoup
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer('tr'))
     player_rows = soup.find_all('tr', class_='player-row')
     player_info_list = {}
 
@@ -443,9 +626,11 @@ def get_fantasypros_top_players():
 
     return player_info_list
 
-def getProjectionsFromAllVegas():
+def getProjectionsFromAllVegas(stage_fingerprints=None):
     link = "https://vegasranks.pythonanywhere.com/getVegasRanks?prop=all&format=ppr"
     resp = requests.get(link)
+    fingerprint = input_fingerprint(resp.content)
+    check_unchanged(stage_fingerprints, "vegas", fingerprint)
     data = resp.json()
 
     sportsbook_proj = {}
@@ -461,35 +646,71 @@ def getProjectionsFromAllVegas():
         sportsbook_proj[player_name] = player_proj
 
     upload_to_azure_blob(sportsbook_proj, "sportsbook_proj.json")
+    if stage_fingerprints is not None:
+        stage_fingerprints["vegas"] = fingerprint
 
     return sportsbook_proj
 
-def getDraftkingsProjections():
-    player_projections = form_player_projections_dict()
+def getDraftkingsProjections(browser_manager=None, stage_fingerprints=None):
+    all_draftkings_selections = get_draftkings_data(browser_manager)
+    # Names and positions come from the players index another timer job rewrites, and simulation settings
+    # are part of the input too, a change to either has to republish the projections
+    players = load_players_index()
+    fingerprint = input_fingerprint(
+        all_draftkings_selections,
+        players,
+        [Config.simulation_engine, Config.simulation_count, Config.exact_engine_grid_step, Config.simulation_quantile_knots],
+    )
+    check_unchanged(stage_fingerprints, "draftkings", fingerprint)
+
+    try:
+        simulation_cache = load_json_from_azure_storage(Config.simulation_cache_blob_name, Config.containername, Config.azure_storage_connection_string)
+    except ResourceNotFoundError:
+        simulation_cache = {}
+
+    player_projections, stat_distributions = form_player_projections_dict(all_draftkings_selections, simulation_cache, players)
     upload_to_azure_blob(player_projections, "hand_calculated_projections.json")
-    
+    # Per player stat distributions, the backend rescores them for each league's exact scoring settings
+    upload_to_azure_blob(stat_distributions, Config.stat_distributions_blob_name)
+    # Binary copy of the same data that the backend memory maps instead of parsing the JSON
+    upload_bytes_to_azure_blob(build_projection_store(player_projections), Config.projection_store_blob_name)
+    upload_to_azure_blob(simulation_cache, Config.simulation_cache_blob_name)
+    if stage_fingerprints is not None:
+        stage_fingerprints["draftkings"] = fingerprint
+
 def download_necessary_fantasy_data():
 
     success = False
+    stage_results = {}
     try:
         now = datetime.now()
         if not (now.month >= 9 or (now.month == 1 and now.day <= 31)):
             logging.info("Not in football season. Skipping data download.")
             return
-        
-        print("Getting draftkings projections")
-        getDraftkingsProjections()
 
-        boris_chen_result = get_boris_chen_tiers()
-        try:
-            player_info_list = get_fantasypros_top_players()
-        except Exception as e:
-            logging.info("Couldn't get updated fantasypros players, matchup data might be slightly out of date")
-            logging.info("Exception is " + str(e))
-        sportsbook_player_ranking = getProjectionsFromAllVegas()
+        # Stages record the fingerprint of their input once their outputs are published, and skip
+        # parsing and uploading when the input matches the last published fingerprint
+        stage_fingerprints = {}
+        if Config.skip_unchanged_stages:
+            try:
+                stage_fingerprints = load_json_from_azure_storage(Config.stage_fingerprints_blob_name, Config.containername, Config.azure_storage_connection_string)
+            except ResourceNotFoundError:
+                pass
+
+        # The scrapes are independent of each other, so they all run concurrently and
+        # share one browser. Fantasypros is optional, if it fails matchup data is just slightly out of date.
+        with BrowserManager() as browser_manager:
+            stages = [
+                Stage("draftkings", partial(getDraftkingsProjections, browser_manager, stage_fingerprints=stage_fingerprints)),
+                Stage("borischen", partial(get_boris_chen_tiers, browser_manager, stage_fingerprints=stage_fingerprints)),
+                Stage("fantasypros", partial(get_fantasypros_top_players, browser_manager), required=False),
+                Stage("vegas", partial(getProjectionsFromAllVegas, stage_fingerprints=stage_fingerprints)),
+            ]
+            success, stage_results = run_stages(stages, max_workers=Config.ingest_stage_workers)
+
+        upload_to_azure_blob(stage_fingerprints, Config.stage_fingerprints_blob_name)
 
         logging.info("Web scraping completed!")
-        success = True
     except Exception as e:
         logging.error("Ran into error while testing, exception is " + str(e))
     finally:
@@ -503,7 +724,9 @@ def download_necessary_fantasy_data():
 
         run_info = {
             "Successful": success,
-            "Runtime": formatted_time
+            "Runtime": formatted_time,
+            "Stages": stage_results,
+            "Skipped Stages": [name for name, result in stage_results.items() if result.get("unchanged")]
         }
         upload_to_azure_blob(run_info, "runinfo.json")
 
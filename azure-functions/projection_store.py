@@ -0,0 +1,78 @@
+import struct
+import numpy as np
+from simulation import expand_quantiles
+
+# Binary snapshot of hand_calculated_projections.json that the backend memory maps.
+# The layout must stay in sync with backend/app/services/projection_store.py.
+#
+#   header   HEADER_FORMAT (magic, version, reserved, n_rows, n_cols, names_len, keys_len, data_offset)
+#   names    column names joined by "\n", padded to 4 bytes
+#   offsets  n_rows + 1 little endian uint32 offsets into the key block
+#   keys     utf-8 player keys, sorted so readers can binary search them
+#   data     n_rows x n_cols little endian float32 matrix at data_offset, NaN for missing values
+PROJECTION_STORE_MAGIC = b"FFPS"
+PROJECTION_STORE_VERSION = 1
+HEADER_FORMAT = "<4sHHIIIII"
+
+STAT_COLUMNS = [
+    "Receptions",
+    "Passing Yards",
+    "Passing Touchdowns",
+    "Interceptions",
+    "Anytime Touchdown",
+    "Receiving Yards",
+    "Rushing Yards",
+]
+SIMULATION_PROFILES = ["STD", "HalfPPR", "PPR", "QB_STD", "QB_6PT"]
+SUMMARY_FIELDS = ["boom", "bust", "mean"]
+PERCENTILES = range(1, 101)
+
+def projection_store_columns():
+    columns = list(STAT_COLUMNS)
+    for profile in SIMULATION_PROFILES:
+        columns.extend(f"{profile}.{field}" for field in SUMMARY_FIELDS)
+        columns.extend(f"{profile}.p{p}" for p in PERCENTILES)
+    return columns
+
+def _pad(block):
+    return block + b"\0" * (-len(block) % 4)
+
+def build_projection_store(expected_stats):
+    """Serialize the player projections dict (as uploaded to hand_calculated_projections.json) to bytes."""
+    columns = projection_store_columns()
+    column_index = {column: i for i, column in enumerate(columns)}
+    keys = sorted(expected_stats)
+
+    matrix = np.full((len(keys), len(columns)), np.nan, dtype="<f4")
+    for row, key in enumerate(keys):
+        for stat_name, value in expected_stats[key].items():
+            if stat_name == "Simulations":
+                for profile, summary in value.items():
+                    if profile not in SIMULATION_PROFILES:
+                        continue
+                    for field in SUMMARY_FIELDS:
+                        matrix[row, column_index[f"{profile}.{field}"]] = summary[field]
+                    for p, percentile_value in expand_quantiles(summary["quantiles"]).items():
+                        matrix[row, column_index[f"{profile}.p{p}"]] = percentile_value
+            elif stat_name in column_index and value is not None:
+                matrix[row, column_index[stat_name]] = value
+
+    names_block = _pad("\n".join(columns).encode("utf-8"))
+    encoded_keys = [key.encode("utf-8") for key in keys]
+    offsets = np.zeros(len(keys) + 1, dtype="<u4")
+    offsets[1:] = np.cumsum([len(key) for key in encoded_keys])
+    keys_block = _pad(offsets.tobytes() + b"".join(encoded_keys))
+
+    data_offset = struct.calcsize(HEADER_FORMAT) + len(names_block) + len(keys_block)
+    header = struct.pack(
+        HEADER_FORMAT,
+        PROJECTION_STORE_MAGIC,
+        PROJECTION_STORE_VERSION,
+        0,
+        len(keys),
+        len(columns),
+        len(names_block),
+        len(keys_block),
+        data_offset,
+    )
+    return header + names_block + keys_block + matrix.tobytes()
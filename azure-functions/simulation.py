@@ -0,0 +1,410 @@
+import hashlib
+import logging
+import multiprocessing
+import numpy as np
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# The ingest job simulates from a stage thread while other threads (browser loop, HTTP pools, the
+# Functions host) are running, forking such a process can deadlock the children. Workers are spawned
+# instead, this module only needs numpy so starting them is cheap
+POOL_START_METHOD = "spawn"
+
+# Stats every simulation tracks, a player without a prop for one of them scores 0 in it
+SIMULATED_STATS = [
+    "Receptions",
+    "Passing Yards",
+    "Passing Touchdowns",
+    "Interceptions",
+    "Anytime Touchdown",
+    "Receiving Yards",
+    "Rushing Yards",
+]
+
+PERCENTILES = list(range(1, 101))
+# Summaries store percentiles as a list of quantile values, see compact_quantiles
+QUANTILE_DECIMALS = 2
+
+# Scoring profiles the simulations are summarized for. Weights are summed in order, QB
+# boom/bust thresholds are inclusive (>=, <=) while everyone else's are strict (>, <).
+QB_SCORING_PROFILES = {
+    "QB_STD": {
+        "weights": {"Passing Yards": 0.04, "Passing Touchdowns": 4, "Interceptions": -2, "Rushing Yards": 0.1, "Receiving Yards": 0.1, "Anytime Touchdown": 6},
+        "boom": 30,
+        "bust": 12,
+        "inclusive": True,
+    },
+    "QB_6PT": {
+        "weights": {"Passing Yards": 0.04, "Passing Touchdowns": 6, "Interceptions": -2, "Rushing Yards": 0.1, "Receiving Yards": 0.1, "Anytime Touchdown": 6},
+        "boom": 35,
+        "bust": 15,
+        "inclusive": True,
+    },
+}
+SCORING_PROFILES = {
+    "STD": {
+        "weights": {"Receiving Yards": 0.1, "Rushing Yards": 0.1, "Anytime Touchdown": 6},
+        "boom": 18,
+        "bust": 5,
+        "inclusive": False,
+    },
+    "HalfPPR": {
+        "weights": {"Receiving Yards": 0.1, "Rushing Yards": 0.1, "Anytime Touchdown": 6, "Receptions": 0.5},
+        "boom": 22,
+        "bust": 6,
+        "inclusive": False,
+    },
+    "PPR": {
+        "weights": {"Receiving Yards": 0.1, "Rushing Yards": 0.1, "Anytime Touchdown": 6, "Receptions": 1.0},
+        "boom": 26,
+        "bust": 6,
+        "inclusive": False,
+    },
+}
+
+def is_qb(player_stats):
+    return "Passing Yards" in player_stats or "Passing Touchdowns" in player_stats
+
+def distribution_arrays(ranges_probs):
+    """
+    Turn { (low, high): prob } ranges into (values, probabilities) arrays. Each range is
+    represented by its exact value if low == high, low * 1.1 for open ended ranges like
+    (125, inf), and its midpoint otherwise.
+    """
+    ranges, probs = zip(*ranges_probs.items())
+    lows = np.array([low for low, high in ranges], dtype=float)
+    highs = np.array([high for low, high in ranges], dtype=float)
+    with np.errstate(invalid="ignore"):
+        values = np.where(lows == highs, lows, np.where(np.isinf(highs), lows * 1.1, (lows + highs) / 2))
+
+    probs = np.array(probs, dtype=float)
+    if not np.all(np.isfinite(probs)) or np.any(probs < 0) or probs.sum() <= 0:
+        raise ValueError("probabilities are not non-negative")
+    return values, probs / probs.sum()
+
+def sample_from_ranges(ranges_probs, n_sims, rng=None):
+    """Sample n_sims values from { (low, high): prob } ranges."""
+    values, probs = distribution_arrays(ranges_probs)
+    chosen_ranges = (rng if rng is not None else np.random).choice(len(values), size=n_sims, p=probs)
+    return values[chosen_ranges]
+
+def player_rng(run_seed, player):
+    """
+    Generator for one player, seeded from the run seed and the player key. Each player's draws
+    are then the same however players are batched or sharded across workers.
+    """
+    player_key = int.from_bytes(hashlib.sha256(player.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(np.random.SeedSequence(run_seed, spawn_key=(player_key,)))
+
+def sample_distributions(distributions, n_sims, rng):
+    """
+    Sample n_sims draws for each (values, probabilities) distribution at once, returning an
+    (n_distributions, n_sims) array. None stands for a stat without a prop and samples as 0.
+    rng is a single Generator, or a list with one Generator per distribution.
+    """
+    width = max([len(dist[0]) for dist in distributions if dist is not None] or [1])
+    values = np.zeros((len(distributions), width))
+    cdf = np.ones((len(distributions), width))
+    last_index = np.zeros(len(distributions), dtype=int)
+    for row, dist in enumerate(distributions):
+        if dist is None:
+            continue
+        dist_values, probs = dist
+        values[row, :len(dist_values)] = dist_values
+        cdf[row, :len(probs)] = np.cumsum(probs)
+        cdf[row, len(probs) - 1:] = 1.0
+        last_index[row] = len(dist_values) - 1
+
+    # Inverse CDF sampling for every row with one searchsorted: rows are shifted apart by 2
+    # so the flattened CDF stays sorted, then indices are shifted back into their row
+    offsets = 2 * np.arange(len(distributions))[:, None]
+    if isinstance(rng, list):
+        uniforms = np.stack([row_rng.random(n_sims) for row_rng in rng]) if rng else np.empty((0, n_sims))
+    else:
+        uniforms = rng.random((len(distributions), n_sims))
+    flat_indices = np.searchsorted((cdf + offsets).ravel(), (uniforms + offsets).ravel(), side="right")
+    indices = flat_indices.reshape(uniforms.shape) - np.arange(len(distributions))[:, None] * width
+    indices = np.minimum(indices, last_index[:, None])
+    return np.take_along_axis(values, indices, axis=1)
+
+def compact_quantiles(percentile_values, knots=len(PERCENTILES)):
+    """
+    Percentiles 1-100 as a plain list of rounded values at `knots` evenly spaced percentiles
+    from 1 to 100. With the default 100 knots entry i is percentile i + 1, fewer knots are
+    interpolated back by expand_quantiles.
+    """
+    knot_percentiles = np.linspace(1, 100, knots)
+    return np.round(np.interp(knot_percentiles, PERCENTILES, percentile_values), QUANTILE_DECIMALS).tolist()
+
+def expand_quantiles(quantiles):
+    """{percentile: value} for percentiles 1-100 from a compact_quantiles list."""
+    knot_percentiles = np.linspace(1, 100, len(quantiles))
+    return dict(zip(PERCENTILES, np.round(np.interp(PERCENTILES, knot_percentiles, quantiles), QUANTILE_DECIMALS).tolist()))
+
+def reduce_quantile_knots(simulations, knots):
+    """Re-knot the quantiles of every scoring type in a player's Simulations entry."""
+    if "error" in simulations:
+        return simulations
+    return {
+        profile: dict(summary, quantiles=compact_quantiles(list(expand_quantiles(summary["quantiles"]).values()), knots))
+        for profile, summary in simulations.items()
+    }
+
+def score_samples(samples, weights):
+    points = None
+    for stat, weight in weights.items():
+        stat_points = samples[stat] * weight
+        points = stat_points if points is None else points + stat_points
+    return points
+
+def percentiles_from_sorted(sorted_points, percentiles=PERCENTILES):
+    """
+    np.percentile's default linear interpolation for every row of an already sorted
+    (n_players, n_sims) array, returned as (n_players, len(percentiles)).
+    """
+    positions = np.asarray(percentiles, dtype=float) / 100 * (sorted_points.shape[1] - 1)
+    below = np.floor(positions).astype(int)
+    above = np.minimum(below + 1, sorted_points.shape[1] - 1)
+    fraction = positions - below
+    return sorted_points[:, below] + (sorted_points[:, above] - sorted_points[:, below]) * fraction
+
+def summarize_scores(points, profile):
+    """
+    Boom/bust probabilities, mean and percentiles 1-100 for each row of points. Each row is
+    sorted once and every summary is read off that sorted array.
+    """
+    sorted_points = np.sort(points, axis=1)
+    n_sims = sorted_points.shape[1]
+    if profile["inclusive"]:
+        boom = np.count_nonzero(sorted_points >= profile["boom"], axis=1) / n_sims
+        bust = np.count_nonzero(sorted_points <= profile["bust"], axis=1) / n_sims
+    else:
+        boom = np.count_nonzero(sorted_points > profile["boom"], axis=1) / n_sims
+        bust = np.count_nonzero(sorted_points < profile["bust"], axis=1) / n_sims
+    means = sorted_points.mean(axis=1)
+    percentile_values = percentiles_from_sorted(sorted_points)
+
+    return [
+        {
+            "boom": float(boom[row]),
+            "bust": float(bust[row]),
+            "mean": float(means[row]),
+            "quantiles": compact_quantiles(percentile_values[row])
+        }
+        for row in range(sorted_points.shape[0])
+    ]
+
+def run_player_sims(players_stats, n_sims=10000, rng=None, run_seed=None):
+    """
+    Run the Monte Carlo sim for every player's stat_probabilities dict in one batch.
+    Returns {player: boom/bust probabilities per scoring type, plus percentiles 1-100 as quantiles},
+    or {player: {"error": ...}} for players whose distributions can't be sampled.
+    With a run_seed every player draws from their own player_rng instead of the shared rng.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    results = {}
+    distributions = {}
+    groups = {True: [], False: []}
+    for player, player_stats in players_stats.items():
+        try:
+            distributions[player] = {stat: distribution_arrays(dist) for stat, dist in player_stats.items()}
+        except Exception as e:
+            results[player] = {"error": str(e)}
+            continue
+        groups[is_qb(player_stats)].append(player)
+
+    for qb_group, players in groups.items():
+        if not players:
+            continue
+        group_rng = [player_rng(run_seed, player) for player in players] if run_seed is not None else rng
+        samples = {
+            stat: sample_distributions([distributions[player].get(stat) for player in players], n_sims, group_rng)
+            for stat in SIMULATED_STATS
+        }
+        profiles = QB_SCORING_PROFILES if qb_group else SCORING_PROFILES
+        for profile_name, profile in profiles.items():
+            summaries = summarize_scores(score_samples(samples, profile["weights"]), profile)
+            for player, summary in zip(players, summaries):
+                results.setdefault(player, {})[profile_name] = summary
+
+    return {player: results[player] for player in players_stats}
+
+def run_player_sim(player_stats, n_sims=10000, rng=None):
+    """Run Monte Carlo sim for one player using stat_probabilities dict."""
+    results = run_player_sims({"player": player_stats}, n_sims, rng)["player"]
+    if "error" in results:
+        raise ValueError(results["error"])
+    return results
+
+# Above this many multiply-adds a convolution is done with FFTs instead of directly
+FFT_CONVOLUTION_THRESHOLD = 1 << 16
+
+def convolve_pmfs(first, second):
+    """Convolve two probability mass functions defined on the same evenly spaced grid."""
+    if len(first) * len(second) <= FFT_CONVOLUTION_THRESHOLD:
+        return np.convolve(first, second)
+    size = len(first) + len(second) - 1
+    fft_size = 1 << (size - 1).bit_length()
+    pmf = np.fft.irfft(np.fft.rfft(first, fft_size) * np.fft.rfft(second, fft_size), fft_size)[:size]
+    # FFT round-off leaves tiny negative probabilities behind
+    return np.clip(pmf, 0, None)
+
+def points_pmf(distribution, weight, grid_step):
+    """
+    Place a stat's (values, probabilities) onto the points grid for the given scoring weight.
+    Returns (index of the first grid cell, pmf over the grid from there).
+    """
+    values, probs = distribution
+    indices = np.rint(values * weight / grid_step).astype(np.int64)
+    first_index = indices.min()
+    return first_index, np.bincount(indices - first_index, weights=probs)
+
+def exact_points_distribution(distributions, weights, grid_step):
+    """Exact fantasy points distribution of a player as (first grid index, pmf)."""
+    first_index, pmf = 0, np.ones(1)
+    for stat, weight in weights.items():
+        if distributions.get(stat) is None or weight == 0:
+            continue
+        stat_first_index, stat_pmf = points_pmf(distributions[stat], weight, grid_step)
+        first_index += stat_first_index
+        pmf = convolve_pmfs(pmf, stat_pmf)
+    return first_index, pmf / pmf.sum()
+
+def summarize_pmf(first_index, pmf, profile, grid_step):
+    """Boom/bust probabilities, mean and quantiles 1-100 read off an exact points distribution."""
+    grid_indices = first_index + np.arange(len(pmf))
+    boom_index = profile["boom"] / grid_step
+    bust_index = profile["bust"] / grid_step
+    if profile["inclusive"]:
+        boom = pmf[grid_indices >= boom_index - 1e-6].sum()
+        bust = pmf[grid_indices <= bust_index + 1e-6].sum()
+    else:
+        boom = pmf[grid_indices > boom_index + 1e-6].sum()
+        bust = pmf[grid_indices < bust_index - 1e-6].sum()
+
+    # Percentile p is the smallest score with at least p% of the probability at or below it
+    cdf = np.cumsum(pmf)
+    last_supported = np.flatnonzero(pmf)[-1]
+    percentile_indices = np.minimum(np.searchsorted(cdf, np.array(PERCENTILES) / 100 - 1e-9), last_supported)
+    percentile_values = np.round((first_index + percentile_indices) * grid_step, 6)
+
+    return {
+        "boom": float(min(boom, 1.0)),
+        "bust": float(min(bust, 1.0)),
+        "mean": float(round(np.dot(grid_indices, pmf) * grid_step, 6)),
+        "quantiles": compact_quantiles(percentile_values)
+    }
+
+def exact_player_distributions(players_stats, grid_step=0.01):
+    """
+    Deterministic alternative to run_player_sims. Scoring is linear in the stats, so each
+    stat's points contribution is discretized onto a grid_step points grid and the stat
+    distributions are convolved into each player's exact fantasy points distribution.
+    Returns the same {player: {scoring type: summary}} structure.
+    """
+    results = {}
+    for player, player_stats in players_stats.items():
+        try:
+            distributions = {stat: distribution_arrays(dist) for stat, dist in player_stats.items()}
+        except Exception as e:
+            results[player] = {"error": str(e)}
+            continue
+
+        profiles = QB_SCORING_PROFILES if is_qb(player_stats) else SCORING_PROFILES
+        results[player] = {}
+        for profile_name, profile in profiles.items():
+            first_index, pmf = exact_points_distribution(distributions, profile["weights"], grid_step)
+            results[player][profile_name] = summarize_pmf(first_index, pmf, profile, grid_step)
+    return results
+
+def simulate_players(players_stats, engine="monte_carlo", n_sims=10000, rng=None, grid_step=0.01, run_seed=None, quantile_knots=len(PERCENTILES)):
+    """Summaries for every player with the chosen engine, "monte_carlo" or "exact"."""
+    if engine == "exact":
+        results = exact_player_distributions(players_stats, grid_step)
+    elif engine == "monte_carlo":
+        results = run_player_sims(players_stats, n_sims, rng, run_seed)
+    else:
+        raise ValueError(f"Unknown simulation engine {engine}")
+
+    if quantile_knots != len(PERCENTILES):
+        results = {player: reduce_quantile_knots(simulations, quantile_knots) for player, simulations in results.items()}
+    return results
+
+def simulate_players_parallel(players_stats, engine="monte_carlo", n_sims=10000, grid_step=0.01, run_seed=None, workers=1, quantile_knots=len(PERCENTILES)):
+    """
+    simulate_players with the players sharded over a process pool. Monte Carlo draws come
+    from per player seeds derived from run_seed, so the output doesn't depend on workers.
+    Falls back to simulating in process when there is one worker or no pool can be started.
+    """
+    simulate = partial(simulate_players, engine=engine, n_sims=n_sims, grid_step=grid_step, run_seed=run_seed, quantile_knots=quantile_knots)
+    workers = min(workers, len(players_stats))
+    if workers <= 1:
+        return simulate(players_stats)
+
+    player_items = list(players_stats.items())
+    shards = [dict(player_items[i::workers]) for i in range(workers)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(POOL_START_METHOD)) as executor:
+            shard_results = list(executor.map(simulate, shards))
+    except (OSError, NotImplementedError, BrokenProcessPool) as e:
+        logging.warning(f"Simulation process pool unavailable, simulating serially: {e}")
+        return simulate(players_stats)
+
+    results = {}
+    for shard_result in shard_results:
+        results.update(shard_result)
+    return {player: results[player] for player in players_stats}
+
+def compact_stat_distributions(players_stats):
+    """
+    {player: {stat: [values, probabilities]}} for every player whose distributions are valid,
+    the JSON friendly form the backend rescores for each league's own scoring settings.
+    """
+    compact = {}
+    for player, player_stats in players_stats.items():
+        try:
+            distributions = {stat: distribution_arrays(dist) for stat, dist in player_stats.items()}
+        except Exception:
+            continue
+        compact[player] = {
+            stat: [np.round(values, 4).tolist(), np.round(probs, 6).tolist()]
+            for stat, (values, probs) in distributions.items()
+        }
+    return compact
+
+def stat_probabilities_hash(player_stats):
+    """Content hash of one player's stat_probabilities, the input everything simulated for them depends on."""
+    canonical = sorted((stat, sorted(dist.items(), key=repr)) for stat, dist in player_stats.items())
+    return hashlib.sha256(repr(canonical).encode("utf-8")).hexdigest()
+
+def simulate_changed_players(players_stats, cache, settings_key, simulate):
+    """
+    Reuse the cached Simulations of players whose stat_probabilities hash the same as last run,
+    and call simulate(players_stats) only for the players that changed.
+
+    cache is {"settings": settings_key, "players": {player: {"hash", "simulations"}}} as persisted
+    by the previous run, it is updated in place to hold this run's players. Entries written with
+    other engine settings are ignored.
+    """
+    cached_players = cache.get("players", {}) if cache.get("settings") == settings_key else {}
+    hashes = {player: stat_probabilities_hash(player_stats) for player, player_stats in players_stats.items()}
+    changed_players = {
+        player: player_stats
+        for player, player_stats in players_stats.items()
+        if cached_players.get(player, {}).get("hash") != hashes[player]
+    }
+    logging.info(f"Simulating {len(changed_players)} of {len(players_stats)} players, the rest are unchanged since the last run")
+
+    simulated = simulate(changed_players) if changed_players else {}
+    results = {
+        player: simulated[player] if player in simulated else cached_players[player]["simulations"]
+        for player in players_stats
+    }
+
+    cache.clear()
+    cache["settings"] = settings_key
+    cache["players"] = {player: {"hash": hashes[player], "simulations": results[player]} for player in players_stats}
+    return results
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# A unit of the ingest pipeline. Stages only start once everything in depends_on
+# has succeeded, stages without a dependency between them run concurrently.
+# Optional stages may fail without failing the run.
+Stage = namedtuple("Stage", ["name", "func", "depends_on", "required"], defaults=[(), True])
+
+class StageUnchanged(Exception):
+    """Raised by a stage whose fetched input matches the last published run, its outputs are left as they are."""
+
+def input_fingerprint(*inputs):
+    """sha256 over a stage's fetched inputs, bytes and str are hashed as is and anything else as sorted JSON."""
+    digest = hashlib.sha256()
+    for value in inputs:
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        elif not isinstance(value, bytes):
+            value = json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+        digest.update(hashlib.sha256(value).digest())
+    return digest.hexdigest()
+
+def check_unchanged(fingerprints, stage_name, fingerprint):
+    """
+    Raise StageUnchanged when fingerprint is the one recorded for the stage's last published outputs.
+    Otherwise the old fingerprint is dropped, so a stage failing halfway through publishing is not
+    skipped next time. The stage records the new fingerprint once all its outputs are uploaded.
+    """
+    if fingerprints is None:
+        return
+    if fingerprints.get(stage_name) == fingerprint:
+        raise StageUnchanged(f"Input unchanged since the last published run ({fingerprint[:12]})")
+    fingerprints.pop(stage_name, None)
+
+def _is_satisfied(result):
+    # Stages skipped for unchanged input still have valid published outputs
+    return result["status"] == "success" or result.get("unchanged", False)
+
+def run_stages(stages, max_workers=4):
+    """
+    Run the stages, returning (all_required_succeeded, {stage name: {"status", "duration", ...}}).
+    A stage raising StageUnchanged is recorded as skipped with "unchanged": True and counts as succeeded.
+    """
+    stages_by_name = {stage.name: stage for stage in stages}
+    results = {}
+    pending = dict(stages_by_name)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                dependency_statuses = [_is_satisfied(results[dep]) if dep in results else None for dep in stage.depends_on]
+                if any(status is False for status in dependency_statuses):
+                    failed = [dep for dep, status in zip(stage.depends_on, dependency_statuses) if status is False]
+                    logging.info(f"Skipping stage {name}, dependencies did not succeed: {failed}")
+                    results[name] = {"status": "skipped", "duration": 0, "reason": "Dependencies did not succeed: " + ", ".join(failed)}
+                    del pending[name]
+                elif all(dependency_statuses):
+                    logging.info(f"Starting stage {name}")
+                    running[executor.submit(_timed_call, stage.func)] = name
+                    del pending[name]
+
+            if not running:
+                # Whatever is left depends on a stage that does not exist
+                for name, stage in pending.items():
+                    results[name] = {"status": "skipped", "duration": 0, "reason": "Unknown dependencies: " + ", ".join(stage.depends_on)}
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                logging.info(f"Stage {name} finished with status {results[name]['status']} in {results[name]['duration']}s")
+
+    all_succeeded = all(
+        _is_satisfied(results[stage.name])
+        for stage in stages
+        if stage.required
+    )
+    return all_succeeded, {stage.name: results[stage.name] for stage in stages}
+
+def _timed_call(func):
+    start = time.time()
+    try:
+        func()
+        status = {"status": "success"}
+    except StageUnchanged as e:
+        logging.info(f"Stage skipped: {e}")
+        status = {"status": "skipped", "reason": str(e), "unchanged": True}
+    except Exception as e:
+        logging.error(f"Stage failed with exception {e}")
+        status = {"status": "failed", "error": str(e)}
+    status["duration"] = round(time.time() - start, 2)
+    return status
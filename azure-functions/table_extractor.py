@@ -0,0 +1,99 @@
+import logging
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# Fastest available parser wins, bs4's html.parser is the always-available fallback
+if HTMLParser is not None:
+    TABLE_PARSER_BACKEND = "selectolax"
+elif lxml is not None:
+    TABLE_PARSER_BACKEND = "lxml"
+else:
+    TABLE_PARSER_BACKEND = "bs4"
+
+# Fantasypros projection tables: second header row holds the stat abbreviations in <small>,
+# player rows carry an "mpb-player-<id>" class and their stat cells are td.center
+HEADER_SELECTOR = "thead tr:nth-of-type(2) th"
+ROW_SELECTOR = 'tbody tr[class^="mpb-player-"]'
+
+def _class_xpath(class_name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+def _parse_selectolax(html):
+    tree = HTMLParser(html)
+    headers = []
+    for header in tree.css(HEADER_SELECTOR):
+        small = header.css_first("small")
+        headers.append(small.text() if small is not None else "")
+    rows = []
+    for row in tree.css(ROW_SELECTOR):
+        name = row.css_first(".player-name")
+        rows.append((name.text().strip() if name is not None else None, [cell.text().strip() for cell in row.css("td.center")]))
+    return headers, rows
+
+def _parse_lxml(html):
+    tree = lxml.html.fromstring(html)
+    headers = []
+    for header in tree.xpath("//thead/tr[2]/th"):
+        small = header.xpath(".//small")
+        headers.append(small[0].text_content() if small else "")
+    rows = []
+    for row in tree.xpath("//tbody/tr[starts-with(@class, 'mpb-player-')]"):
+        name = row.xpath(f".//*[{_class_xpath('player-name')}]")
+        cells = row.xpath(f".//td[{_class_xpath('center')}]")
+        rows.append((name[0].text_content().strip() if name else None, [cell.text_content().strip() for cell in cells]))
+    return headers, rows
+
+def _parse_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    headers = [header.find("small").text if header.find("small") else "" for header in soup.select(HEADER_SELECTOR)]
+    rows = []
+    for row in soup.select(ROW_SELECTOR):
+        name = row.select_one(".player-name")
+        rows.append((name.text.strip() if name is not None else None, [cell.text.strip() for cell in row.select("td.center")]))
+    return headers, rows
+
+_PARSERS = {
+    "selectolax": _parse_selectolax,
+    "lxml": _parse_lxml,
+    "bs4": _parse_bs4,
+}
+
+def _to_number(text):
+    try:
+        return float(text.replace(",", ""))
+    except ValueError:
+        return text
+
+def extract_projection_table(html, column_namer, backend=None):
+    """
+    Extract a fantasypros projection table as {player name: {stat name: value}}.
+
+    column_namer gets the header labels once and returns {stat cell index: stat name},
+    stat values are returned as floats where they parse as numbers.
+    """
+    headers, rows = _PARSERS[backend or TABLE_PARSER_BACKEND](html)
+    cell_to_stat_name = column_namer(headers)
+
+    projections = {}
+    for player_name, cells in rows:
+        if player_name is None:
+            logging.info("Skipping fantasypros row without a player name")
+            continue
+        projections[player_name] = {
+            cell_to_stat_name[index]: _to_number(cell)
+            for index, cell in enumerate(cells)
+            if index in cell_to_stat_name
+        }
+    return projections
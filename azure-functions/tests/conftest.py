@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The function app modules are flat top level modules, import them the way the Functions host does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
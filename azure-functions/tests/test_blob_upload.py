@@ -0,0 +1,26 @@
+import pytest
+import function_app
+from blob_codec import COMPRESSED_BLOB_SUFFIX, decode_blob_payload
+from config import Config
+
+@pytest.fixture
+def blob_calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(function_app, "upload_bytes_to_azure_blob", lambda payload, blob_name, filename="file": calls.append(("upload", blob_name, payload)))
+    monkeypatch.setattr(function_app, "delete_azure_blob", lambda blob_name: calls.append(("delete", blob_name, None)))
+    return calls
+
+def test_compressed_copy_is_uploaded_before_the_plain_blob(blob_calls, monkeypatch):
+    monkeypatch.setattr(Config, "write_plain_json_blobs", True)
+    monkeypatch.setattr(Config, "write_compressed_json_blobs", True)
+    function_app.upload_to_azure_blob({"a": 1}, "owned.json")
+
+    assert [(action, blob_name) for action, blob_name, _ in blob_calls] == [("upload", "owned.json" + COMPRESSED_BLOB_SUFFIX), ("upload", "owned.json")]
+    assert decode_blob_payload(blob_calls[0][2]) == decode_blob_payload(blob_calls[1][2]) == {"a": 1}
+
+def test_compressed_copy_is_deleted_when_no_longer_written(blob_calls, monkeypatch):
+    monkeypatch.setattr(Config, "write_plain_json_blobs", True)
+    monkeypatch.setattr(Config, "write_compressed_json_blobs", False)
+    function_app.upload_to_azure_blob({"a": 1}, "owned.json")
+
+    assert [(action, blob_name) for action, blob_name, _ in blob_calls] == [("delete", "owned.json" + COMPRESSED_BLOB_SUFFIX), ("upload", "owned.json")]
@@ -0,0 +1,19 @@
+import pytest
+import draftkings_help
+
+PAYLOAD = b"""{"selections": [
+    {"outcomeType": "Other"},
+    {"outcomeType": "Over", "participants": [{}], "displayOdds": {}},
+    {"outcomeType": "Over", "participants": [{"name": "Ja'Marr Chase"}], "displayOdds": {"american": "\xe2\x88\x92125"}, "points": 5.5, "label": "Over"},
+    {"outcomeType": "Under", "displayOdds": {"american": "+105"}, "points": 5.5}
+]}"""
+
+@pytest.mark.parametrize("use_ijson", [True, False])
+def test_selections_without_odds_are_left_out(monkeypatch, use_ijson):
+    if not use_ijson:
+        monkeypatch.setattr(draftkings_help, "ijson", None)
+    assert draftkings_help.extract_selections(PAYLOAD) == [
+        ("Over", "Ja'Marr Chase", "−125", 5.5, "Over"),
+        ("Under", None, "+105", 5.5, None),
+    ]
+    assert draftkings_help.american_odds_to_int("−125") == -125
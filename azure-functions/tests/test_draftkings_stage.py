@@ -0,0 +1,29 @@
+import pytest
+import function_app
+from stage_runner import StageUnchanged
+
+@pytest.fixture
+def draftkings_stage(monkeypatch):
+    inputs = {"selections": {"Anytime Touchdown": [["Anytime Scorer", "Player One", "+150", None, None]]}, "players": {"1": {"full_name": "Player One", "fantasy_positions": ["WR"]}}}
+    published = []
+    monkeypatch.setattr(function_app, "get_draftkings_data", lambda browser_manager: inputs["selections"])
+    monkeypatch.setattr(function_app, "load_players_index", lambda: inputs["players"])
+    monkeypatch.setattr(function_app, "load_json_from_azure_storage", lambda *args: {})
+    monkeypatch.setattr(function_app, "form_player_projections_dict", lambda selections, cache, players: (published.append(players) or {}, {}))
+    monkeypatch.setattr(function_app, "build_projection_store", lambda projections: b"")
+    monkeypatch.setattr(function_app, "upload_to_azure_blob", lambda *args, **kwargs: None)
+    monkeypatch.setattr(function_app, "upload_bytes_to_azure_blob", lambda *args, **kwargs: None)
+    return inputs, published
+
+def test_new_sleeper_player_republishes_unchanged_odds(draftkings_stage):
+    inputs, published = draftkings_stage
+    fingerprints = {}
+    function_app.getDraftkingsProjections(stage_fingerprints=fingerprints)
+    with pytest.raises(StageUnchanged):
+        function_app.getDraftkingsProjections(stage_fingerprints=fingerprints)
+
+    inputs["players"] = dict(inputs["players"], **{"2": {"full_name": "Player Two", "fantasy_positions": ["RB"]}})
+    function_app.getDraftkingsProjections(stage_fingerprints=fingerprints)
+    # The index in the fingerprint is the one the projections were built from
+    assert len(published) == 2
+    assert published[-1] is inputs["players"]
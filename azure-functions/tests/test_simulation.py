@@ -0,0 +1,81 @@
+import pytest
+from draftkings_help import (
+    over_under_projections,
+    calculate_expected_yards_batch,
+    expected_anytime_touchdown,
+)
+from simulation import simulate_players, simulate_players_parallel, SCORING_PROFILES, QB_SCORING_PROFILES
+
+RUN_SEED = 20250907
+N_SIMS = 40000
+
+def build_players():
+    """A QB, RB, WR and TE built from DraftKings style odds the way form_player_projections_dict does."""
+    receptions = over_under_projections(
+        lines=[2.5, 6.5, 4.5],
+        odds_over=[-130, 110, -105],
+        odds_under=[100, -140, -125],
+    )
+    receiving_yards = calculate_expected_yards_batch([{25: -250, 40: 120}, {60: -140, 80: 150, 100: 310}, {40: -160, 60: 175}], 0.071)
+    rushing_yards = calculate_expected_yards_batch([{60: -180, 80: 130, 100: 290}, {15: 150}], 0.071)
+    passing_yards = calculate_expected_yards_batch([{200: -400, 250: -110, 300: 260}], 0.071)
+    # calculate_expected_tds_batch keys passing TDs by line rather than (low, high) ranges, which
+    # neither engine samples, so the QB's passing TDs come from an over/under line instead
+    interceptions, passing_tds = over_under_projections(lines=[0.5, 1.5], odds_over=[105, -150], odds_under=[-135, 120])
+
+    def td(anytime, twoplus):
+        return expected_anytime_touchdown(odds_one_or_more=anytime, odds_two_or_more=twoplus)[1]
+
+    return {
+        "runningback": {
+            "Rushing Yards": rushing_yards[0][1],
+            "Receptions": receptions[0][1],
+            "Receiving Yards": receiving_yards[0][1],
+            "Anytime Touchdown": td(-120, 380),
+        },
+        "widereceiver": {
+            "Receptions": receptions[1][1],
+            "Receiving Yards": receiving_yards[1][1],
+            "Anytime Touchdown": td(110, 650),
+        },
+        "tightend": {
+            "Receptions": receptions[2][1],
+            "Receiving Yards": receiving_yards[2][1],
+            "Anytime Touchdown": td(190, 0),
+        },
+        "quarterback": {
+            "Passing Yards": passing_yards[0][1],
+            "Passing Touchdowns": passing_tds[1],
+            "Interceptions": interceptions[1],
+            "Rushing Yards": rushing_yards[1][1],
+            "Anytime Touchdown": td(400, 0),
+        },
+    }
+
+def test_exact_engine_matches_monte_carlo():
+    players = build_players()
+    exact = simulate_players(players, engine="exact", grid_step=0.01)
+    monte_carlo = simulate_players(players, engine="monte_carlo", n_sims=N_SIMS, run_seed=RUN_SEED)
+
+    for player, stats in players.items():
+        profiles = QB_SCORING_PROFILES if player == "quarterback" else SCORING_PROFILES
+        for profile in profiles:
+            exact_summary, sampled_summary = exact[player][profile], monte_carlo[player][profile]
+            assert "error" not in exact_summary and "error" not in sampled_summary
+            assert sampled_summary["mean"] == pytest.approx(exact_summary["mean"], rel=0.02, abs=0.05), (player, profile)
+            assert sampled_summary["boom"] == pytest.approx(exact_summary["boom"], abs=0.01), (player, profile)
+            assert sampled_summary["bust"] == pytest.approx(exact_summary["bust"], abs=0.01), (player, profile)
+
+def test_monte_carlo_is_reproducible_with_a_run_seed():
+    players = build_players()
+    first = simulate_players(players, engine="monte_carlo", n_sims=2000, run_seed=RUN_SEED)
+    second = simulate_players(dict(reversed(list(players.items()))), engine="monte_carlo", n_sims=2000, run_seed=RUN_SEED)
+    assert first == second
+
+def test_spawned_worker_shards_match_in_process(caplog):
+    players = {f"{player}{copy}": stats for copy in range(3) for player, stats in build_players().items()}
+    in_process = simulate_players_parallel(players, n_sims=2000, run_seed=RUN_SEED, workers=1)
+    sharded = simulate_players_parallel(players, n_sims=2000, run_seed=RUN_SEED, workers=3)
+    assert sharded == in_process
+    # The pool has to have run, not the serial fallback
+    assert "simulating serially" not in caplog.text
@@ -0,0 +1,52 @@
+import pytest
+from stage_runner import Stage, StageUnchanged, check_unchanged, input_fingerprint, run_stages
+
+def test_input_fingerprint_is_stable_and_order_sensitive():
+    assert input_fingerprint({"b": 1, "a": 2}, "text") == input_fingerprint({"a": 2, "b": 1}, b"text")
+    assert input_fingerprint("a", "b") != input_fingerprint("b", "a")
+    # Inputs are hashed separately, so they cannot run into each other
+    assert input_fingerprint("ab", "c") != input_fingerprint("a", "bc")
+
+def test_check_unchanged():
+    fingerprints = {"vegas": "abc"}
+    with pytest.raises(StageUnchanged):
+        check_unchanged(fingerprints, "vegas", "abc")
+    assert fingerprints == {"vegas": "abc"}
+
+    # A changed input drops the old fingerprint until the stage publishes again
+    check_unchanged(fingerprints, "vegas", "def")
+    assert fingerprints == {}
+
+    check_unchanged(None, "vegas", "abc")
+
+def test_run_stages_treats_unchanged_stages_as_succeeded():
+    ran = []
+
+    def unchanged():
+        raise StageUnchanged("same input")
+
+    def failing():
+        raise ValueError("boom")
+
+    stages = [
+        Stage("fetch", unchanged),
+        Stage("publish", lambda: ran.append("publish"), depends_on=("fetch",)),
+        Stage("optional", failing, required=False),
+        Stage("after_optional", lambda: ran.append("after_optional"), depends_on=("optional",)),
+        Stage("orphan", lambda: ran.append("orphan"), depends_on=("missing",)),
+    ]
+    success, results = run_stages(stages, max_workers=2)
+
+    assert ran == ["publish"]
+    assert results["fetch"]["status"] == "skipped" and results["fetch"]["unchanged"]
+    assert results["publish"]["status"] == "success"
+    assert results["optional"]["status"] == "failed"
+    assert results["after_optional"]["status"] == "skipped"
+    assert results["orphan"]["reason"] == "Unknown dependencies: missing"
+    # The failed and skipped stages after it are required, so the run does not count as a success
+    assert not success
+
+def test_run_stages_succeeds_when_only_optional_stages_fail():
+    success, results = run_stages([Stage("required", lambda: None), Stage("optional", lambda: 1 / 0, required=False)])
+    assert success
+    assert results["optional"]["status"] == "failed"
@@ -0,0 +1,65 @@
+import re
+import pytest
+import function_app
+from config import Config
+
+POSITIONS = ["QB", "WR", "TE", "RB", "DEF", "K"]
+WEEKLY_URL = re.compile(r"/stats/nfl/\d+/(\d+)\?.*position=(\w+)")
+
+def week_stats(week, position):
+    return [{"player_id": f"{position}{week}", "stats": {"pts_half_ppr": week}}]
+
+@pytest.fixture
+def sleeper(monkeypatch):
+    state = {"cache": {}, "empty": set(), "fetched": []}
+    current_week = 8
+
+    def load_json_from_azure_storage(blob_name, *args):
+        if blob_name not in state["cache"]:
+            raise function_app.ResourceNotFoundError("missing")
+        return state["cache"][blob_name]
+
+    def load_json_from_urls(urls):
+        responses = []
+        for url in urls:
+            match = WEEKLY_URL.search(url)
+            if match:
+                week, position = int(match.group(1)), match.group(2)
+                state["fetched"].append((week, position))
+                responses.append([] if week in state["empty"] else week_stats(week, position))
+            else:
+                responses.append([])
+        return responses
+
+    monkeypatch.setattr(function_app, "load_relevant_sleeper_players", lambda url: {})
+    monkeypatch.setattr(function_app, "get_current_nfl_week", lambda year: current_week)
+    monkeypatch.setattr(function_app, "load_json_from_azure_storage", load_json_from_azure_storage)
+    monkeypatch.setattr(function_app, "load_json_from_urls", load_json_from_urls)
+    monkeypatch.setattr(function_app, "upload_to_azure_blob", lambda data, blob_name, filename="file": state["cache"].__setitem__(blob_name, data))
+    return state, current_week
+
+def cached_weeks(state):
+    return sorted(int(blob_name.rsplit("_", 1)[1].split(".")[0]) for blob_name in state["cache"] if blob_name.startswith("sleeper_weekly_stats/"))
+
+def test_only_complete_weeks_outside_the_refetch_window_are_cached(sleeper):
+    state, current_week = sleeper
+    state["empty"] = {2}
+    function_app.get_sleeper_player_data()
+
+    frozen = [week for week in range(1, current_week + 1) if week <= current_week - Config.weekly_stats_refetch_weeks]
+    assert cached_weeks(state) == [week for week in frozen if week != 2]
+
+    # Cached weeks are not fetched again, the empty one and the refetch window are
+    state["fetched"].clear()
+    state["empty"] = set()
+    function_app.get_sleeper_player_data()
+    assert sorted({week for week, _ in state["fetched"]}) == [2] + list(range(frozen[-1] + 1, current_week + 1))
+    assert cached_weeks(state) == frozen
+
+def test_cached_week_with_an_empty_position_is_fetched_again(sleeper):
+    state, current_week = sleeper
+    blob_name = Config.weekly_stats_cache_blob_name
+    state["cache"][blob_name.format(year=function_app.datetime.now().year, week=1)] = {position: ([] if position == "K" else week_stats(1, position)) for position in POSITIONS}
+
+    function_app.get_sleeper_player_data()
+    assert (1, "K") in state["fetched"]
@@ -4,6 +4,7 @@ from config import Config
 from flask_cors import CORS  # Import CORS
 from flask_caching import Cache
 import redis
+import gc
 
 def _load_local_settings():
     """Load local.settings.json if present (for local dev only)."""
@@ -21,7 +22,7 @@ def _load_local_settings():
                     print("Setting " + str(k) + " to " + str(v))
                     os.environ.setdefault(k, v)
 
-def create_app():
+def create_app(preload=None):
     _load_local_settings()
     app = Flask(__name__)
     frontend_connections = os.environ.get('FRONTEND_URL')
@@ -49,5 +50,21 @@ def create_app():
     # Register blueprints
     from app.routes import main
     app.register_blueprint(main)
+
+    if preload is None:
+        from app.config import Config as DataConfig
+        preload = DataConfig.preload_reference_data
+
+    if preload:
+        # Under gunicorn --preload this runs once in the master, forked workers
+        # then share the snapshot pages copy-on-write instead of downloading it again
+        from app.services.sleeper_service import warm_reference_snapshot
+        try:
+            warm_reference_snapshot()
+            # Move everything allocated so far out of the collector's reach so
+            # gc passes in the workers don't dirty the shared pages
+            gc.freeze()
+        except Exception as e:
+            app.logger.warning(f"Preloading reference data failed, workers will load it lazily: {e}")
     
     return app
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 class Config:
 
@@ -12,6 +13,47 @@ class Config:
     azure_storage_connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
     containername = "fantasyjsons"
 
+    # Prefer the compressed "<name>.ffjz" copy of a blob, falling back to the plain JSON one. The ingest job uploads
+    # it before the plain blob and deletes it when it stops writing it, so it is never older than the plain one
+    read_compressed_json_blobs = os.getenv("READ_COMPRESSED_BLOBS", "true").lower() in ["1", "true", "yes"]
+
+    # Blobs kept in the per-process reference snapshot (see snapshot_service)
+    reference_blobs = [
+        "players.json",
+        "borischen_tiers.json",
+        "hand_calculated_projections.json",
+        "backup_fantasypros_projections.json",
+        "fantasypros_data.json",
+        "owned.json",
+    ]
+    # Loaded into the snapshot when present, older ingest runs did not write them
+    optional_reference_blobs = [
+        "stat_distributions.json",
+    ]
+    # Matches the redis expiry for cached user data, the ingest job runs at most every 15 minutes
+    snapshot_ttl_seconds = int(os.getenv("SNAPSHOT_TTL_SECONDS", "900"))
+    # An expired snapshot only reloads the blobs whose ETags changed, keeping the others and the indexes derived from them
+    revalidate_snapshot_etags = os.getenv("REVALIDATE_SNAPSHOT_ETAGS", "true").lower() in ["1", "true", "yes"]
+    # Load the snapshot in create_app so a preloading gunicorn master shares it with its workers
+    preload_reference_data = os.getenv("PRELOAD_REFERENCE_DATA", "false").lower() in ["1", "true", "yes"]
+
+    # Serve hand_calculated_projections.json from the memory mapped binary copy written by the ingest job
+    use_projection_store = os.getenv("USE_PROJECTION_STORE", "true").lower() in ["1", "true", "yes"]
+    projection_store_blob_name = "hand_calculated_projections.bin"
+    projection_store_dir = os.getenv("PROJECTION_STORE_DIR", os.path.join(tempfile.gettempdir(), "fantasy_projection_store"))
+
+    # "players.json" in the snapshot is served from the slim identity index when the ingest job has written it,
+    # no view uses the per-position scoring detail shards it writes next to it
+    players_index_blob_name = "players/index.json"
+
+    # Boom/bust and percentiles are rescored from the published stat distributions with each league's exact
+    # scoring settings, instead of using the nearest precomputed STD/HalfPPR/PPR/QB profile
+    use_league_distributions = os.getenv("USE_LEAGUE_DISTRIBUTIONS", "true").lower() in ["1", "true", "yes"]
+    stat_distributions_blob_name = "stat_distributions.json"
+    # Same points grid as the ingest exact engine. Coarser grids round yard midpoints like 37.5 (3.75 points)
+    # onto neighbouring cells and move boom/bust, the mean and quantiles
+    distribution_grid_step = 0.01
+
     boris_chen_fantasy_relevant_pos = ["K", "DEF", "DST", "QB", "TE", "WR", "RB", "Flex"]
     relevant_sleeper_keys = ["fantasy_positions", "full_name"]
 
@@ -1,5 +1,7 @@
 from flask import request, Blueprint, jsonify, current_app
 from app.services.sleeper_service import cache_sleeper_user_info, load_json_from_azure_storage
+from app.services.snapshot_service import get_snapshot_status
+from app.services.quantiles import expand_player_rows
 import traceback
 from app.config import Config
 import json
@@ -20,17 +22,20 @@ def load_sleeper_info():
         if not name:
             return jsonify({'error': 'Username is required'}), 400
         
-        suggested_lineups, free_agent_recs = cache_sleeper_user_info(name, user_uuid, website)
+        suggested_lineups, free_agent_recs, player_quantiles = cache_sleeper_user_info(name, user_uuid, website)
 
         cache_key = f"boris_data_{user_uuid}"
 
         fa_cache_key = f"free_agents_{user_uuid}"
 
+        quantiles_cache_key = f"quantiles_{user_uuid}"
+
         redis_client = current_app.redis_client
 
         try:
             redis_client.set(cache_key, json.dumps(suggested_lineups), ex=900)  # Timeout set to 300 seconds
             redis_client.set(fa_cache_key, json.dumps(free_agent_recs), ex=900)
+            redis_client.set(quantiles_cache_key, json.dumps(player_quantiles), ex=900)
         except Exception as e:
             print("Ran into exception setting cache. Exception is " + str(e))
             tb_str = traceback.format_exc()
@@ -69,11 +74,13 @@ def load_league_data():
 
     cache_key = f"boris_data_{user_uuid}"
     fa_cache_key = f"free_agents_{user_uuid}"
+    quantiles_cache_key = f"quantiles_{user_uuid}"
 
     redis_client = current_app.redis_client
 
     user_data = redis_client.get(cache_key)
     free_agent_data = redis_client.get(fa_cache_key)
+    quantiles_data = redis_client.get(quantiles_cache_key)
 
     if not user_data:
         return jsonify({'error': 'No data found for the specified user',
@@ -95,7 +102,16 @@ def load_league_data():
                         'cache_key': cache_key,
                         'jsonified_data': jsonified_data}), 404
 
-    return jsonify({"suggested_starts": league_data, "free_agent_recs": free_agent_recs}), 200
+    # Quantile lists are cached once per player, keyed by player_quantiles_key of the rows.
+    # expand=percentiles puts the full percentile dicts on the rows instead
+    league_quantiles = json.loads(quantiles_data).get(league, {}) if quantiles_data else {}
+    if "percentiles" in request.args.get('expand', '').split(','):
+        expand_player_rows(league_data, league_quantiles)
+        for position_recs in (free_agent_recs or {}).values():
+            expand_player_rows(position_recs, league_quantiles)
+        return jsonify({"suggested_starts": league_data, "free_agent_recs": free_agent_recs}), 200
+
+    return jsonify({"suggested_starts": league_data, "free_agent_recs": free_agent_recs, "quantiles": league_quantiles}), 200
 
 @main.route('/load-last-run-info', methods=['GET'])
 def load_last_run_info():
@@ -105,3 +121,8 @@ def load_last_run_info():
 
 
 
+
+@main.route('/ready', methods=['GET'])
+def ready():
+    status = get_snapshot_status()
+    return jsonify(status), 200 if status["ready"] else 503
@@ -0,0 +1,22 @@
+import gzip
+import json
+import struct
+
+# Compressed blob format, written by azure-functions/blob_codec.py.
+# Payload is a small header (magic + schema version) followed by gzip'd compact JSON,
+# blobs without the magic prefix are treated as the legacy plain JSON format.
+COMPRESSED_BLOB_MAGIC = b"FFJZ"
+COMPRESSED_BLOB_SCHEMA_VERSION = 1
+COMPRESSED_BLOB_HEADER = "<4sH"
+# Not ".gz", the header in front of the gzip stream means gzip tools cannot read these
+COMPRESSED_BLOB_SUFFIX = ".ffjz"
+
+def decode_blob_payload(raw):
+    header_size = struct.calcsize(COMPRESSED_BLOB_HEADER)
+    if raw[:len(COMPRESSED_BLOB_MAGIC)] != COMPRESSED_BLOB_MAGIC:
+        return json.loads(raw)
+
+    _, schema_version = struct.unpack_from(COMPRESSED_BLOB_HEADER, raw, 0)
+    if schema_version != COMPRESSED_BLOB_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported compressed blob schema version {schema_version}")
+    return json.loads(gzip.decompress(raw[header_size:]))
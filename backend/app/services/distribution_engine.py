@@ -0,0 +1,154 @@
+import hashlib
+import json
+import time
+import logging
+import numpy as np
+from app.config import Config
+from app.services.snapshot_service import get_reference_snapshot
+from app.services.quantiles import PERCENTILES, QUANTILE_DECIMALS
+
+logger = logging.getLogger(__name__)
+
+# Stats in the distributions published by the ingest job (see azure-functions/simulation.py)
+DISTRIBUTION_STATS = [
+    "Receptions",
+    "Passing Yards",
+    "Passing Touchdowns",
+    "Interceptions",
+    "Anytime Touchdown",
+    "Receiving Yards",
+    "Rushing Yards",
+]
+
+# Boom/bust thresholds of the precomputed simulation profiles. Leagues are scored with their own
+# weights, the thresholds come from the profile calculate_potential_fantasy_score would have picked.
+BOOM_BUST_THRESHOLDS = {
+    "QB_STD": {"boom": 30, "bust": 12, "inclusive": True},
+    "QB_6PT": {"boom": 35, "bust": 15, "inclusive": True},
+    "STD": {"boom": 18, "bust": 5, "inclusive": False},
+    "HalfPPR": {"boom": 22, "bust": 6, "inclusive": False},
+    "PPR": {"boom": 26, "bust": 6, "inclusive": False},
+}
+
+def league_scoring_weights(stat_point_multipliers, rec_points):
+    weights = {stat: stat_point_multipliers[stat] for stat in DISTRIBUTION_STATS if stat != "Receptions"}
+    weights["Receptions"] = rec_points
+    return weights
+
+def scoring_fingerprint(weights):
+    return hashlib.sha1(json.dumps(sorted(weights.items())).encode("utf-8")).hexdigest()
+
+def boom_bust_thresholds(is_qb, weights):
+    if is_qb:
+        return BOOM_BUST_THRESHOLDS["QB_6PT" if weights["Passing Touchdowns"] > 4 else "QB_STD"]
+    if weights["Receptions"] < 0.3:
+        return BOOM_BUST_THRESHOLDS["STD"]
+    if weights["Receptions"] < 0.75:
+        return BOOM_BUST_THRESHOLDS["HalfPPR"]
+    return BOOM_BUST_THRESHOLDS["PPR"]
+
+def score_distributions(stat_distributions, weights, grid_step):
+    """
+    Exact fantasy point distributions of every player for the given scoring weights.
+
+    Each stat's points contribution is placed on a grid_step points grid, then the stat
+    distributions of all players are convolved at once with batched FFTs. Returns
+    (players, first grid index per player, (n_players, grid cells) pmf matrix).
+    """
+    players = list(stat_distributions)
+    cells_by_stat = {}
+    first_index = np.zeros(len(players), dtype=np.int64)
+    grid_cells = np.ones(len(players), dtype=np.int64)
+    for stat in DISTRIBUTION_STATS:
+        if weights.get(stat, 0) == 0:
+            continue
+        for row, player in enumerate(players):
+            if stat not in stat_distributions[player]:
+                continue
+            values, probs = stat_distributions[player][stat]
+            cells = np.rint(np.asarray(values, dtype=float) * weights[stat] / grid_step).astype(np.int64)
+            first_index[row] += cells.min()
+            grid_cells[row] += cells.max() - cells.min()
+            cells_by_stat.setdefault(stat, []).append((row, cells - cells.min(), probs))
+
+    width = int(grid_cells.max())
+    fft_size = 1 << (width - 1).bit_length()
+    spectrum = np.ones((len(players), fft_size // 2 + 1), dtype=complex)
+    for stat, placed in cells_by_stat.items():
+        # Players without this stat get a point mass at 0, so it leaves their distribution unchanged
+        stat_pmfs = np.zeros((len(players), fft_size))
+        stat_pmfs[:, 0] = 1.0
+        for row, cells, probs in placed:
+            stat_pmfs[row, 0] = 0.0
+            np.add.at(stat_pmfs[row], cells, probs)
+        spectrum *= np.fft.rfft(stat_pmfs, axis=1)
+
+    # FFT round-off leaves tiny negative probabilities behind
+    pmfs = np.clip(np.fft.irfft(spectrum, fft_size, axis=1)[:, :width], 0, None)
+    pmfs /= pmfs.sum(axis=1, keepdims=True)
+    return players, first_index, pmfs
+
+def summarize_distributions(players, first_index, pmfs, thresholds, grid_step):
+    """Boom/bust probabilities, mean and quantiles 1-100 per player, in the Simulations profile format."""
+    grid = first_index[:, None] + np.arange(pmfs.shape[1])[None, :]
+    boom_cells = np.array([t["boom"] for t in thresholds]) / grid_step
+    bust_cells = np.array([t["bust"] for t in thresholds]) / grid_step
+    inclusive = np.array([t["inclusive"] for t in thresholds])
+
+    boom_mask = np.where(inclusive[:, None], grid >= boom_cells[:, None] - 1e-6, grid > boom_cells[:, None] + 1e-6)
+    bust_mask = np.where(inclusive[:, None], grid <= bust_cells[:, None] + 1e-6, grid < bust_cells[:, None] - 1e-6)
+    boom = np.minimum((pmfs * boom_mask).sum(axis=1), 1.0)
+    bust = np.minimum((pmfs * bust_mask).sum(axis=1), 1.0)
+    means = (pmfs * grid).sum(axis=1) * grid_step
+
+    # Percentile p is the smallest score with at least p% of the probability at or below it. Rows are
+    # shifted apart by 2 so all of them can be searched with one searchsorted over the flattened CDFs.
+    cdfs = np.cumsum(pmfs, axis=1)
+    row_offsets = 2 * np.arange(len(players))[:, None]
+    targets = np.array(PERCENTILES)[None, :] / 100 - 1e-9
+    flat_cells = np.searchsorted((cdfs + row_offsets).ravel(), (targets + row_offsets).ravel())
+    cells = flat_cells.reshape(len(players), len(PERCENTILES)) - np.arange(len(players))[:, None] * pmfs.shape[1]
+    cells = np.minimum(cells, pmfs.shape[1] - 1)
+    percentile_values = np.round((first_index[:, None] + cells) * grid_step, QUANTILE_DECIMALS)
+
+    return {
+        player: {
+            "boom": float(boom[row]),
+            "bust": float(bust[row]),
+            "mean": float(round(means[row], 4)),
+            "quantiles": percentile_values[row].tolist()
+        }
+        for row, player in enumerate(players)
+    }
+
+def build_league_summaries(stat_distributions, weights, grid_step):
+    start = time.time()
+    if not stat_distributions:
+        return {}
+    players, first_index, pmfs = score_distributions(stat_distributions, weights, grid_step)
+    thresholds = [
+        boom_bust_thresholds("Passing Yards" in stat_distributions[player] or "Passing Touchdowns" in stat_distributions[player], weights)
+        for player in players
+    ]
+    summaries = summarize_distributions(players, first_index, pmfs, thresholds, grid_step)
+    logger.info(f"Scored {len(players)} player distributions for scoring {scoring_fingerprint(weights)[:8]} in {time.time() - start:.3f}s")
+    return summaries
+
+def get_league_boom_bust(playerkey, stat_point_multipliers, rec_points):
+    """
+    Boom/bust summary of a player under a league's exact scoring, or None when there is no
+    published distribution for them. All players are scored together the first time a scoring
+    fingerprint is seen, and kept with the reference snapshot they were computed from.
+    """
+    snapshot = get_reference_snapshot()
+    stat_distributions = snapshot.blobs.get(Config.stat_distributions_blob_name)
+    if not stat_distributions:
+        return None
+
+    weights = league_scoring_weights(stat_point_multipliers, rec_points)
+    summaries = snapshot.derive(
+        ("league_distributions", scoring_fingerprint(weights)),
+        lambda s: build_league_summaries(stat_distributions, weights, Config.distribution_grid_step),
+        depends_on=[Config.stat_distributions_blob_name],
+    )
+    return summaries.get(playerkey)
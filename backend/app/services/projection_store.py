@@ -0,0 +1,151 @@
+import os
+import glob
+import mmap
+import struct
+import logging
+from collections.abc import Mapping
+import numpy as np
+from app.services.quantiles import QUANTILE_DECIMALS
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceModifiedError
+from azure.storage.blob import BlobServiceClient
+
+logger = logging.getLogger(__name__)
+
+# Must stay in sync with azure-functions/projection_store.py, which writes the file.
+PROJECTION_STORE_MAGIC = b"FFPS"
+PROJECTION_STORE_VERSION = 1
+HEADER_FORMAT = "<4sHHIIIII"
+
+
+class ProjectionStore(Mapping):
+    """
+    Read-only view over a memory mapped projection snapshot. Behaves like the
+    hand_calculated_projections.json dict (player key -> projections) but rows
+    are only decoded when looked up, and every process mapping the same file
+    shares one page cached copy.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, n_rows, n_cols, names_len, keys_len, data_offset = struct.unpack_from(HEADER_FORMAT, self._mmap, 0)
+        if magic != PROJECTION_STORE_MAGIC or version != PROJECTION_STORE_VERSION:
+            raise ValueError(f"Unsupported projection store {path}: magic {magic}, version {version}")
+
+        names_start = struct.calcsize(HEADER_FORMAT)
+        columns = self._mmap[names_start:names_start + names_len].rstrip(b"\0").decode("utf-8").split("\n")
+
+        offsets_start = names_start + names_len
+        self._n_rows = n_rows
+        self._offsets = np.frombuffer(self._mmap, dtype="<u4", count=n_rows + 1, offset=offsets_start)
+        self._keys_start = offsets_start + 4 * (n_rows + 1)
+        self._data = np.frombuffer(self._mmap, dtype="<f4", count=n_rows * n_cols, offset=data_offset).reshape(n_rows, n_cols)
+
+        # Column layout: plain stat names, then "<profile>.boom|bust|mean|p<n>" per simulation profile
+        self._stat_columns = []
+        self._profiles = {}
+        for i, column in enumerate(columns):
+            if "." not in column:
+                self._stat_columns.append((column, i))
+                continue
+            profile, field = column.split(".", 1)
+            profile_columns = self._profiles.setdefault(profile, {"quantiles": []})
+            if field.startswith("p"):
+                profile_columns["quantiles"].append(i)
+            else:
+                profile_columns[field] = i
+
+    def _key_at(self, row):
+        start = self._keys_start + int(self._offsets[row])
+        end = self._keys_start + int(self._offsets[row + 1])
+        return self._mmap[start:end]
+
+    def _find_row(self, key):
+        if not isinstance(key, str):
+            return None
+        target = key.encode("utf-8")
+        low, high = 0, self._n_rows
+        while low < high:
+            mid = (low + high) // 2
+            if self._key_at(mid) < target:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self._n_rows and self._key_at(low) == target:
+            return low
+        return None
+
+    def __contains__(self, key):
+        return self._find_row(key) is not None
+
+    def __getitem__(self, key):
+        row = self._find_row(key)
+        if row is None:
+            raise KeyError(key)
+        values = self._data[row]
+
+        projections = {}
+        for stat_name, i in self._stat_columns:
+            if not np.isnan(values[i]):
+                projections[stat_name] = float(values[i])
+
+        simulations = {}
+        for profile, profile_columns in self._profiles.items():
+            if np.isnan(values[profile_columns["mean"]]):
+                continue
+            simulations[profile] = {
+                "boom": float(values[profile_columns["boom"]]),
+                "bust": float(values[profile_columns["bust"]]),
+                "mean": float(values[profile_columns["mean"]]),
+                "quantiles": np.round(values[profile_columns["quantiles"]].astype(float), QUANTILE_DECIMALS).tolist(),
+            }
+        projections["Simulations"] = simulations if simulations else {"error": "Not enough data"}
+        return projections
+
+    def __iter__(self):
+        for row in range(self._n_rows):
+            yield self._key_at(row).decode("utf-8")
+
+    def __len__(self):
+        return self._n_rows
+
+
+def load_projection_store(blob_name, container_name, connection_string, store_dir):
+    """
+    Download the binary snapshot to store_dir (once per blob version per host) and map it.
+    Files are named after the blob ETag, so workers on the same host map the same file and
+    picking up a new snapshot is just mapping a new file.
+    """
+    blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+    blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
+    etag = blob_client.get_blob_properties().etag
+
+    os.makedirs(store_dir, exist_ok=True)
+    stem = os.path.splitext(blob_name)[0]
+    version = etag.strip('"')
+    path = os.path.join(store_dir, f"{stem}-{version}.bin")
+
+    if not os.path.exists(path):
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        # Only download the version the file is named after, a blob replaced since raises ResourceModifiedError
+        try:
+            with open(temp_path, "wb") as f:
+                blob_client.download_blob(etag=etag, match_condition=MatchConditions.IfNotModified).readinto(f)
+        except ResourceModifiedError:
+            os.remove(temp_path)
+            raise
+        os.replace(temp_path, path)
+        logger.info(f"Downloaded projection store {blob_name} to {path}")
+
+        # Older snapshots can be unlinked safely, processes still mapping them keep their pages
+        for old_path in glob.glob(os.path.join(store_dir, f"{stem}-*.bin")):
+            if old_path != path:
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+
+    return ProjectionStore(path)
@@ -0,0 +1,37 @@
+import numpy as np
+
+PERCENTILES = list(range(1, 101))
+QUANTILE_DECIMALS = 2
+
+# Simulations summaries carry percentiles 1-100 as a "quantiles" list of values at evenly spaced
+# percentiles from 1 to 100 (100 knots unless the ingest job was configured with fewer).
+# Roster and free agent rows are cached without it, each league's lists are kept once per player in a
+# {player key: quantiles} map next to them and only expanded when a client asks.
+
+def summary_quantiles(summary):
+    """Quantile list of a Simulations profile summary, also accepting the older {percentile: value} dict."""
+    if "quantiles" in summary:
+        return list(summary["quantiles"])
+    return [float(value) for _, value in sorted(summary["percentiles"].items(), key=lambda item: int(item[0]))]
+
+def expand_quantiles(quantiles):
+    """{"1": value, ..., "100": value} from a quantile list, interpolating between knots."""
+    knot_percentiles = np.linspace(1, 100, len(quantiles))
+    values = np.round(np.interp(PERCENTILES, knot_percentiles, quantiles), QUANTILE_DECIMALS)
+    return {str(p): value for p, value in zip(PERCENTILES, values.tolist())}
+
+def player_quantiles_key(row):
+    """A row's key in its league's quantiles map, the sleeper player id or the name for players without one."""
+    return row.get("PID", row["NAME"])
+
+def expand_player_rows(rows, player_quantiles=None):
+    """Set the PERCENTILES dict the player table reads on each row with quantiles, in place."""
+    for row in rows or []:
+        # Rows cached before the quantiles map carry their own list
+        quantiles = row.pop("QUANTILES", None)
+        if quantiles is None and player_quantiles:
+            quantiles = player_quantiles.get(player_quantiles_key(row))
+        if quantiles is None:
+            continue
+        row["PERCENTILES"] = expand_quantiles(quantiles) if isinstance(quantiles, list) else quantiles
+    return rows
@@ -6,9 +6,14 @@ from app.config import Config
 from datetime import datetime
 from collections import defaultdict
 from azure.storage.blob import BlobServiceClient
+from azure.core.exceptions import ResourceNotFoundError
+from app.services.blob_codec import decode_blob_payload, COMPRESSED_BLOB_SUFFIX
 from copy import copy, deepcopy
 import heapq
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.services.snapshot_service import get_reference_snapshot
+from app.services.distribution_engine import get_league_boom_bust
+from app.services.quantiles import summary_quantiles, player_quantiles_key
 import logging
 
 # Configure logging
@@ -22,15 +27,20 @@ def load_json_from_azure_storage(blob_name, container_name, connection_string):
     print(connection_string)
     blob_service_client = BlobServiceClient.from_connection_string(connection_string)
 
-    # Get the blob client
-    blob_client = blob_service_client.get_blob_client(container=container_name, blob=blob_name)
+    # Download the blob content, preferring the compressed copy when there is one
+    blob_data = None
+    if Config.read_compressed_json_blobs:
+        try:
+            blob_data = blob_service_client.get_blob_client(container=container_name, blob=blob_name + COMPRESSED_BLOB_SUFFIX).download_blob()
+        except ResourceNotFoundError:
+            blob_data = None
+    if blob_data is None:
+        blob_data = blob_service_client.get_blob_client(container=container_name, blob=blob_name).download_blob()
 
-    # Download the blob content
-    blob_data = blob_client.download_blob()
-    data = json.loads(blob_data.readall())
+    data = decode_blob_payload(blob_data.readall())
 
      # If this is the players blob, normalize special cases once centrally
-    if blob_name.lower() == "players.json":
+    if blob_name.lower() in ["players.json", Config.players_index_blob_name]:
         try:
             normalize_players_positions(data)
         except Exception as e:
@@ -57,9 +67,11 @@ def cache_sleeper_user_info(username, user_uuid, website_name = "Sleeper"):
 
     boris_chen_dict = prepare_boris_chen_tier_dict()
     league_position_groups = prepare_position_groups_for_leagues(user_rosters, pidToPlayerDict)
-    suggested_lineups = form_suggested_starts_based_on_boris(user_rosters, league_position_groups, boris_chen_dict, nameToPidDict)
-    free_agents = form_top_free_agents_parallel(user_rosters, nameToPidDict)
-    return suggested_lineups, free_agents
+    # {league: {player key: quantiles}}, so the rows do not each carry a copy
+    player_quantiles = defaultdict(dict)
+    suggested_lineups = form_suggested_starts_based_on_boris(user_rosters, league_position_groups, boris_chen_dict, nameToPidDict, player_quantiles)
+    free_agents = form_top_free_agents_parallel(user_rosters, nameToPidDict, player_quantiles)
+    return suggested_lineups, free_agents, player_quantiles
 
 def normalize_players_positions(players_dict):
     """
@@ -265,11 +277,20 @@ def get_fleaflicker_rosters_and_convert_to_sleeper(email, nameToPidDict):
 
     return curr_rosters
 
+def warm_reference_snapshot():
+    """Load the reference snapshot and build its indexes ahead of the first request."""
+    prepare_pid_to_name_dict()
+    prepare_boris_chen_tier_dict()
+    return get_reference_snapshot()
+
 def prepare_pid_to_name_dict():
+    return get_reference_snapshot().derive("pid_to_name", build_pid_to_name_dict, depends_on=["players.json"])
+
+def build_pid_to_name_dict(snapshot):
     pidToPlayerDict = {}
     nameToPidDict = {}
 
-    data = load_json_from_azure_storage("players.json", Config.containername, Config.azure_storage_connection_string)
+    data = snapshot.get("players.json")
         
     for pid in data:
         pidToPlayerDict[pid] = data[pid]
@@ -279,8 +300,11 @@ def prepare_pid_to_name_dict():
     return pidToPlayerDict, nameToPidDict
 
 def prepare_boris_chen_tier_dict():
+    return get_reference_snapshot().derive("boris_chen_tiers", build_boris_chen_tier_dict, depends_on=["borischen_tiers.json"])
 
-    data = load_json_from_azure_storage("borischen_tiers.json", Config.containername, Config.azure_storage_connection_string)
+def build_boris_chen_tier_dict(snapshot):
+
+    data = snapshot.get("borischen_tiers.json")
     player_tiers = defaultdict(dict)
     for pos_ranking in data:
         for tier_num in data[pos_ranking]:
@@ -311,15 +335,16 @@ def prepare_position_groups_for_leagues(user_rosters, pidToPlayerDict):
         league_position_groups[league_name] = position_groups
     return league_position_groups
 
-def form_suggested_starts_based_on_boris(user_rosters, league_position_groups, boris_chen_tiers, nameToPidDict):
+def form_suggested_starts_based_on_boris(user_rosters, league_position_groups, boris_chen_tiers, nameToPidDict, player_quantiles):
 
     suggested_starts = {}
 
     #sportsbook_projections = load_json_from_azure_storage("sportsbook_proj.json", Config.containername, Config.azure_storage_connection_string)
-    sportsbook_projections = load_json_from_azure_storage("hand_calculated_projections.json", Config.containername, Config.azure_storage_connection_string)
-    backup_projections = load_json_from_azure_storage("backup_fantasypros_projections.json", Config.containername, Config.azure_storage_connection_string)
-    fantasypros_data = load_json_from_azure_storage("fantasypros_data.json", Config.containername, Config.azure_storage_connection_string)
-    player_data = load_json_from_azure_storage("players.json", Config.containername, Config.azure_storage_connection_string)
+    snapshot = get_reference_snapshot()
+    sportsbook_projections = snapshot.get("hand_calculated_projections.json")
+    backup_projections = snapshot.get("backup_fantasypros_projections.json")
+    fantasypros_data = snapshot.get("fantasypros_data.json")
+    player_data = snapshot.get("players.json")
 
     for roster in user_rosters:
         position_groups = copy(league_position_groups[roster["league"]])
@@ -343,7 +368,7 @@ def form_suggested_starts_based_on_boris(user_rosters, league_position_groups, b
 
         for player in get_all_players_from_position_groups(position_groups):
             pos_rank_dict = {}
-            tiers_for_player = tiers_to_lookup.intersection(boris_chen_tiers[player])
+            tiers_for_player = tiers_to_lookup.intersection(boris_chen_tiers.get(player, {}))
             if len(tiers_for_player) == 0:
                 pos_rank_dict["Position"] = "Unranked"
 
@@ -444,11 +469,10 @@ def form_suggested_starts_based_on_boris(user_rosters, league_position_groups, b
                     if boom_bust is not None:
                         temp_dict["BOOM"] = round(boom_bust["boom"] * 100, 2)
                         temp_dict["BUST"] = round(boom_bust["bust"] * 100, 2)
-                        temp_dict["PERCENTILES"] = boom_bust["percentiles"]
+                        player_quantiles[str(roster["league"])][player_quantiles_key(temp_dict)] = summary_quantiles(boom_bust)
                     else:
                         temp_dict["BOOM"] = "N/A. Not enough vegas props"
                         temp_dict["BUST"] = "N/A"
-                        temp_dict["PERCENTILES"] = "N/A"
                     if old_projection:
                         temp_dict["VEGAS"] += "\t Old projection, no lines available, confirm uninjured"
 
@@ -465,7 +489,7 @@ def form_suggested_starts_based_on_boris(user_rosters, league_position_groups, b
 
     return suggested_starts
 
-def form_top_free_agents_parallel(user_rosters, nameToPidDict, max_workers=8):
+def form_top_free_agents_parallel(user_rosters, nameToPidDict, player_quantiles, max_workers=8):
     """
     Returns the top 3 free agents per position (QB, RB, WR, TE) for each league,
     formatted exactly like form_suggested_starts_based_on_boris.
@@ -474,11 +498,12 @@ def form_top_free_agents_parallel(user_rosters, nameToPidDict, max_workers=8):
     free_agents_by_league = {}
 
     # Load all data once
-    sportsbook_projections = load_json_from_azure_storage("hand_calculated_projections.json", Config.containername, Config.azure_storage_connection_string)
-    backup_projections = load_json_from_azure_storage("backup_fantasypros_projections.json", Config.containername, Config.azure_storage_connection_string)
-    fantasypros_data = load_json_from_azure_storage("fantasypros_data.json", Config.containername, Config.azure_storage_connection_string)
-    player_data = load_json_from_azure_storage("players.json", Config.containername, Config.azure_storage_connection_string)
-    owned_data = load_json_from_azure_storage("owned.json", Config.containername, Config.azure_storage_connection_string)
+    snapshot = get_reference_snapshot()
+    sportsbook_projections = snapshot.get("hand_calculated_projections.json")
+    backup_projections = snapshot.get("backup_fantasypros_projections.json")
+    fantasypros_data = snapshot.get("fantasypros_data.json")
+    player_data = snapshot.get("players.json")
+    owned_data = snapshot.get("owned.json")
 
     for roster in user_rosters:
         league_name = roster["league"]
@@ -544,11 +569,10 @@ def form_top_free_agents_parallel(user_rosters, nameToPidDict, max_workers=8):
                 if boom_bust:
                     temp_dict["BOOM"] = round(boom_bust["boom"] * 100, 2)
                     temp_dict["BUST"] = round(boom_bust["bust"] * 100, 2)
-                    temp_dict["PERCENTILES"] = boom_bust["percentiles"]
+                    player_quantiles[str(league_name)][player_quantiles_key(temp_dict)] = summary_quantiles(boom_bust)
                 else:
                     temp_dict["BOOM"] = "N/A"
                     temp_dict["BUST"] = "N/A"
-                    temp_dict["PERCENTILES"] = "N/A"
 
                 p_info_dict = fantasypros_data.get(name, None)
                 if p_info_dict:
@@ -729,6 +753,13 @@ def calculate_potential_fantasy_score(player, pos_group, player_stat_projections
                     boom_bust_probabilities = boom_bust["HalfPPR"]
                 else:
                     boom_bust_probabilities = boom_bust["PPR"]
+            if Config.use_league_distributions:
+                try:
+                    league_boom_bust = get_league_boom_bust(playerkey, stat_point_multipliers, rec_points)
+                    if league_boom_bust is not None:
+                        boom_bust_probabilities = league_boom_bust
+                except Exception as e:
+                    logger.warning(f"League distribution unavailable for {player}, using precomputed profile: {e}")
             continue
         if key == "Receptions":
             proj_points += float(val) * rec_points
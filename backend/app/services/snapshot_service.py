@@ -0,0 +1,221 @@
+import threading
+import time
+import logging
+from azure.storage.blob import BlobServiceClient
+from azure.core.exceptions import ResourceNotFoundError
+from app.config import Config
+from app.services.blob_codec import COMPRESSED_BLOB_SUFFIX
+from app.services.projection_store import load_projection_store
+
+logger = logging.getLogger(__name__)
+
+# The snapshot is a module level singleton so that, when gunicorn preloads the
+# app, the master builds it once and every forked worker shares its pages.
+_snapshot = None
+_snapshot_lock = threading.Lock()
+_MISSING = object()
+
+
+class ReferenceSnapshot:
+    """
+    Reference blobs downloaded from storage plus any indexes derived from them.
+    Indexes are built through derive() so they are computed once per snapshot,
+    and are only rebuilt when a blob they were derived from is reloaded.
+    """
+
+    def __init__(self, blobs, etags=None):
+        self.blobs = blobs
+        # {reference blob: {source blob: ETag}}, None when they could not be read
+        self.etags = etags
+        self.loaded_at = time.time()
+        self.validated_at = self.loaded_at
+        self._derived = {}
+        self._derived_dependencies = {}
+        # Keys derived since the last refresh, the others are dropped then
+        self._derived_used = set()
+        self._derived_lock = threading.Lock()
+
+    def get(self, blob_name):
+        return self.blobs[blob_name]
+
+    def derive(self, key, builder, depends_on=None):
+        """
+        Build an index once per snapshot. depends_on names the reference blobs builder reads, the
+        index is kept across reloads of any other blob. Without it the index is rebuilt on every reload.
+        """
+        self._derived_used.add(key)
+        value = self._derived.get(key, _MISSING)
+        if value is _MISSING:
+            with self._derived_lock:
+                value = self._derived.get(key, _MISSING)
+                if value is _MISSING:
+                    value = builder(self)
+                    self._derived_dependencies[key] = None if depends_on is None else frozenset(depends_on)
+                    self._derived[key] = value
+        return value
+
+    def carry_over_derived(self, previous, changed_blobs):
+        """Reuse the indexes of previous used since its last refresh that were not derived from any of changed_blobs."""
+        with previous._derived_lock:
+            for key, value in previous._derived.items():
+                depends_on = previous._derived_dependencies.get(key)
+                if key in previous._derived_used and depends_on is not None and not depends_on & changed_blobs:
+                    self._derived[key] = value
+                    self._derived_dependencies[key] = depends_on
+
+    def evict_unused_derived(self):
+        """Drop the indexes nothing derived since the last refresh, so per league entries do not pile up."""
+        with self._derived_lock:
+            used, self._derived_used = self._derived_used, set()
+            for key in [key for key in self._derived if key not in used]:
+                del self._derived[key]
+                self._derived_dependencies.pop(key, None)
+
+    def is_expired(self):
+        return time.time() - self.validated_at > Config.snapshot_ttl_seconds
+
+
+def snapshot_source_blobs(blob_name):
+    """Every blob load_reference_blob may read blob_name from."""
+    blob_names = [Config.players_index_blob_name, blob_name] if blob_name == "players.json" else [blob_name]
+    sources = []
+    for name in blob_names:
+        sources.append(name)
+        if Config.read_compressed_json_blobs:
+            sources.append(name + COMPRESSED_BLOB_SUFFIX)
+    if blob_name == "hand_calculated_projections.json" and Config.use_projection_store:
+        sources.append(Config.projection_store_blob_name)
+    return sources
+
+
+def reference_blob_etags():
+    """{reference blob: {source blob: ETag}} of the snapshot's blobs, None for sources that do not exist."""
+    blob_service_client = BlobServiceClient.from_connection_string(Config.azure_storage_connection_string)
+    etags = {}
+    for blob_name in Config.reference_blobs + Config.optional_reference_blobs:
+        etags[blob_name] = {}
+        for source in snapshot_source_blobs(blob_name):
+            try:
+                etags[blob_name][source] = blob_service_client.get_blob_client(container=Config.containername, blob=source).get_blob_properties().etag
+            except ResourceNotFoundError:
+                etags[blob_name][source] = None
+    return etags
+
+
+def load_reference_blob(blob_name):
+    # Imported here to avoid a circular import with sleeper_service
+    from app.services.sleeper_service import load_json_from_azure_storage
+
+    if blob_name == "hand_calculated_projections.json" and Config.use_projection_store:
+        try:
+            return load_projection_store(Config.projection_store_blob_name, Config.containername, Config.azure_storage_connection_string, Config.projection_store_dir)
+        except Exception as e:
+            logger.warning(f"Projection store unavailable, falling back to {blob_name}: {e}")
+    if blob_name == "players.json":
+        try:
+            return load_json_from_azure_storage(Config.players_index_blob_name, Config.containername, Config.azure_storage_connection_string)
+        except ResourceNotFoundError:
+            logger.warning(f"Players index not found, falling back to {blob_name}")
+    return load_json_from_azure_storage(blob_name, Config.containername, Config.azure_storage_connection_string)
+
+
+def load_reference_blobs(blob_names, blobs):
+    """Download blob_names into blobs, skipping optional blobs that do not exist."""
+    for blob_name in blob_names:
+        try:
+            blobs[blob_name] = load_reference_blob(blob_name)
+        except ResourceNotFoundError:
+            if blob_name not in Config.optional_reference_blobs:
+                raise
+            logger.info(f"Optional reference blob {blob_name} not found, skipping it")
+
+
+def read_reference_blob_etags():
+    if not Config.revalidate_snapshot_etags:
+        return None
+    try:
+        return reference_blob_etags()
+    except Exception as e:
+        logger.warning(f"Could not read reference blob ETags, the snapshot will be reloaded when it expires: {e}")
+        return None
+
+
+def load_reference_snapshot():
+    start = time.time()
+    # Read before downloading, a blob replaced in between then just looks changed at the next refresh
+    etags = read_reference_blob_etags()
+    blobs = {}
+    load_reference_blobs(Config.reference_blobs + Config.optional_reference_blobs, blobs)
+
+    snapshot = ReferenceSnapshot(blobs, etags)
+    logger.info(f"Loaded reference snapshot ({len(blobs)} blobs) in {time.time() - start:.2f}s")
+    return snapshot
+
+
+def refresh_reference_snapshot(snapshot):
+    """
+    Bring an expired snapshot up to date. Only the blobs whose source ETags changed are downloaded
+    again, the others and the indexes derived from them alone are carried over as they are, so their
+    pages stay shared with a preloading master. Indexes nothing used since the last refresh are
+    dropped either way. A snapshot without ETags is reloaded entirely.
+    """
+    if snapshot.etags is None:
+        return load_reference_snapshot()
+    etags = read_reference_blob_etags()
+    if etags is None:
+        return load_reference_snapshot()
+
+    changed_blobs = {blob_name for blob_name in etags if etags[blob_name] != snapshot.etags.get(blob_name)}
+    if not changed_blobs:
+        snapshot.evict_unused_derived()
+        snapshot.validated_at = time.time()
+        return snapshot
+
+    start = time.time()
+    blobs = {blob_name: blob for blob_name, blob in snapshot.blobs.items() if blob_name not in changed_blobs}
+    load_reference_blobs([blob_name for blob_name in etags if blob_name in changed_blobs], blobs)
+
+    # A new snapshot rather than an update in place, requests still holding the old one keep a consistent view
+    refreshed = ReferenceSnapshot(blobs, etags)
+    refreshed.carry_over_derived(snapshot, changed_blobs)
+    logger.info(f"Reloaded {', '.join(sorted(changed_blobs))} into the reference snapshot in {time.time() - start:.2f}s")
+    return refreshed
+
+
+def get_reference_snapshot():
+    """
+    Return the current snapshot, loading it if missing. Once older than the TTL the blobs whose
+    ETags changed are reloaded, while other requests keep being served the expired snapshot.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and not snapshot.is_expired():
+        return snapshot
+
+    if snapshot is None:
+        _snapshot_lock.acquire()
+    elif not _snapshot_lock.acquire(blocking=False):
+        # Another request is already refreshing it
+        return snapshot
+    try:
+        if _snapshot is None:
+            _snapshot = load_reference_snapshot()
+        elif _snapshot.is_expired():
+            _snapshot = refresh_reference_snapshot(_snapshot)
+        return _snapshot
+    finally:
+        _snapshot_lock.release()
+
+
+def get_snapshot_status():
+    snapshot = _snapshot
+    if snapshot is None:
+        return {"ready": False}
+    return {
+        "ready": True,
+        "loaded_at": snapshot.loaded_at,
+        "validated_at": snapshot.validated_at,
+        "age_seconds": round(time.time() - snapshot.loaded_at, 1),
+        "expired": snapshot.is_expired(),
+        "blobs": list(snapshot.blobs.keys()),
+    }
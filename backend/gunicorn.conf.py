@@ -0,0 +1,5 @@
+import os
+
+# With PRELOAD_REFERENCE_DATA set, wsgi.py is imported once in the master so the
+# reference snapshot built by create_app is shared copy-on-write by all workers.
+preload_app = os.environ.get("PRELOAD_REFERENCE_DATA", "false").lower() in ["1", "true", "yes"]
@@ -0,0 +1,65 @@
+import importlib.util
+import os
+import numpy as np
+import pytest
+from app.config import Config
+from app.services.distribution_engine import DISTRIBUTION_STATS, build_league_summaries
+
+# The ingest job's simulation module, loaded by path since both trees have a top level config module
+SIMULATION_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "azure-functions", "simulation.py")
+spec = importlib.util.spec_from_file_location("ingest_simulation", SIMULATION_PATH)
+simulation = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(simulation)
+
+def yard_ranges(lines, over_probs):
+    """Ranges laid out like calculate_expected_yards_batch output."""
+    ranges = {(lines[i], lines[i + 1]): over_probs[i] - over_probs[i + 1] for i in range(len(lines) - 1)}
+    ranges[(0, lines[0])] = 1 - over_probs[0]
+    ranges[(lines[-1], float('inf'))] = over_probs[-1]
+    return ranges
+
+def count_ranges(probs):
+    return {(count, count): prob for count, prob in enumerate(probs)}
+
+def build_players():
+    rng = np.random.default_rng(42)
+    players = {}
+    for i in range(60):
+        if i % 6 == 0:
+            players[f"quarterback{i}"] = {
+                "Passing Yards": yard_ranges([175, 200, 225, 250, 275, 300], np.sort(rng.uniform(0.05, 0.95, 6))[::-1]),
+                "Passing Touchdowns": count_ranges(rng.dirichlet(np.ones(5))),
+                "Interceptions": count_ranges(rng.dirichlet(np.ones(3))),
+                "Rushing Yards": yard_ranges([15, 25, 40], np.sort(rng.uniform(0.05, 0.95, 3))[::-1]),
+                "Anytime Touchdown": count_ranges(rng.dirichlet(np.ones(3))),
+            }
+        else:
+            players[f"flex{i}"] = {
+                "Receptions": count_ranges(rng.dirichlet(np.ones(12))),
+                "Receiving Yards": yard_ranges([25, 40, 60, 80, 100], np.sort(rng.uniform(0.05, 0.95, 5))[::-1]),
+                "Rushing Yards": yard_ranges([15, 40, 60, 80], np.sort(rng.uniform(0.05, 0.95, 4))[::-1]),
+                "Anytime Touchdown": count_ranges(rng.dirichlet(np.ones(3))),
+            }
+    return players
+
+@pytest.mark.parametrize("profile_name", list(simulation.SCORING_PROFILES) + list(simulation.QB_SCORING_PROFILES))
+def test_league_summaries_match_ingest_exact_engine(profile_name):
+    players = build_players()
+    is_qb_profile = profile_name in simulation.QB_SCORING_PROFILES
+    profile = (simulation.QB_SCORING_PROFILES if is_qb_profile else simulation.SCORING_PROFILES)[profile_name]
+    weights = {stat: profile["weights"].get(stat, 0) for stat in DISTRIBUTION_STATS}
+
+    expected = simulation.exact_player_distributions(players, grid_step=0.01)
+    summaries = build_league_summaries(simulation.compact_stat_distributions(players), weights, Config.distribution_grid_step)
+
+    for player in players:
+        if simulation.is_qb(players[player]) != is_qb_profile:
+            continue
+        engine_summary, ingest_summary = summaries[player], expected[player][profile_name]
+        assert engine_summary["boom"] == pytest.approx(ingest_summary["boom"], abs=1e-5), player
+        assert engine_summary["bust"] == pytest.approx(ingest_summary["bust"], abs=1e-5), player
+        assert engine_summary["mean"] == pytest.approx(ingest_summary["mean"], abs=1e-3), player
+        # Published probabilities are rounded to 6 decimals, so a percentile whose CDF crossing sits
+        # within that rounding can land on the neighbouring score
+        differing = np.flatnonzero(~np.isclose(engine_summary["quantiles"], ingest_summary["quantiles"]))
+        assert len(differing) <= 1, (player, differing)
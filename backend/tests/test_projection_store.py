@@ -0,0 +1,33 @@
+import pytest
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceModifiedError
+from app.services import projection_store
+
+class ReplacedBlobClient:
+    """A blob the ingest job replaces between the properties read and the download."""
+
+    class Properties:
+        etag = '"0x1"'
+
+    def get_blob_properties(self):
+        return self.Properties()
+
+    def download_blob(self, etag=None, match_condition=None):
+        assert match_condition == MatchConditions.IfNotModified
+        if etag != '"0x2"':
+            raise ResourceModifiedError("The condition specified using HTTP conditional header(s) is not met.")
+
+class FakeBlobServiceClient:
+    @classmethod
+    def from_connection_string(cls, connection_string):
+        return cls()
+
+    def get_blob_client(self, container, blob):
+        return ReplacedBlobClient()
+
+def test_replaced_blob_is_not_cached_under_the_old_etag(tmp_path, monkeypatch):
+    monkeypatch.setattr(projection_store, "BlobServiceClient", FakeBlobServiceClient)
+
+    with pytest.raises(ResourceModifiedError):
+        projection_store.load_projection_store("hand_calculated_projections.bin", "container", "connection", str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,21 @@
+from app.services.quantiles import expand_player_rows, expand_quantiles, player_quantiles_key
+
+def test_rows_are_expanded_from_the_league_quantiles_map():
+    quantiles = [float(value) for value in range(100)]
+    rows = [
+        {"NAME": "Player One", "PID": "1"},
+        {"NAME": "Player Two"},
+        {"NAME": "Buffalo Bills", "TEAM": "BUF"},
+    ]
+    player_quantiles = {player_quantiles_key(rows[0]): quantiles, player_quantiles_key(rows[1]): quantiles[::-1]}
+
+    expand_player_rows(rows, player_quantiles)
+    assert rows[0]["PERCENTILES"] == expand_quantiles(quantiles)
+    assert rows[1]["PERCENTILES"] == expand_quantiles(quantiles[::-1])
+    assert "PERCENTILES" not in rows[2]
+
+def test_rows_cached_with_their_own_quantiles_are_still_expanded():
+    rows = [{"NAME": "Player One", "PID": "1", "QUANTILES": [1.0, 2.0]}, {"NAME": "Player Two", "QUANTILES": "N/A"}]
+    expand_player_rows(rows, {})
+    assert rows[0]["PERCENTILES"]["1"] == 1.0 and rows[0]["PERCENTILES"]["100"] == 2.0
+    assert rows[1] == {"NAME": "Player Two", "PERCENTILES": "N/A"}
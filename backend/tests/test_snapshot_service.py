@@ -0,0 +1,89 @@
+import pytest
+from app.config import Config
+from app.services import snapshot_service
+
+@pytest.fixture
+def storage(monkeypatch):
+    """Blob contents and ETags served to snapshot_service instead of Azure storage, plus the blobs it downloaded."""
+    storage = {"versions": {blob_name: 1 for blob_name in Config.reference_blobs + Config.optional_reference_blobs}, "downloads": []}
+
+    def reference_blob_etags():
+        return {blob_name: {blob_name: f'"{version}"'} for blob_name, version in storage["versions"].items()}
+
+    def load_reference_blob(blob_name):
+        storage["downloads"].append(blob_name)
+        return {"blob": blob_name, "version": storage["versions"][blob_name]}
+
+    monkeypatch.setattr(Config, "revalidate_snapshot_etags", True)
+    monkeypatch.setattr(snapshot_service, "reference_blob_etags", reference_blob_etags)
+    monkeypatch.setattr(snapshot_service, "load_reference_blob", load_reference_blob)
+    return storage
+
+def test_refresh_reloads_only_changed_blobs(storage):
+    snapshot = snapshot_service.load_reference_snapshot()
+    players = snapshot.get("players.json")
+    pid_to_name = snapshot.derive("pid_to_name", lambda s: object(), depends_on=["players.json"])
+    snapshot.derive("projections_index", lambda s: object(), depends_on=["hand_calculated_projections.json"])
+    snapshot.derive("undeclared", lambda s: object())
+
+    storage["downloads"].clear()
+    storage["versions"]["hand_calculated_projections.json"] += 1
+    refreshed = snapshot_service.refresh_reference_snapshot(snapshot)
+
+    assert storage["downloads"] == ["hand_calculated_projections.json"]
+    assert refreshed is not snapshot
+    assert refreshed.get("players.json") is players
+    assert refreshed.get("hand_calculated_projections.json")["version"] == 2
+    # Only indexes declared to depend solely on unchanged blobs are carried over
+    assert refreshed.derive("pid_to_name", lambda s: object(), depends_on=["players.json"]) is pid_to_name
+    assert set(refreshed._derived) == {"pid_to_name"}
+    # The previous snapshot is left as it was for requests still holding it
+    assert snapshot.get("hand_calculated_projections.json")["version"] == 1
+
+def test_refresh_keeps_unchanged_snapshot(storage):
+    snapshot = snapshot_service.load_reference_snapshot()
+    storage["downloads"].clear()
+    snapshot.validated_at = 0
+
+    assert snapshot_service.refresh_reference_snapshot(snapshot) is snapshot
+    assert storage["downloads"] == []
+    assert not snapshot.is_expired()
+
+def test_refresh_without_etags_reloads_everything(storage):
+    snapshot = snapshot_service.load_reference_snapshot()
+    snapshot.etags = None
+    storage["downloads"].clear()
+
+    snapshot_service.refresh_reference_snapshot(snapshot)
+    assert storage["downloads"] == Config.reference_blobs + Config.optional_reference_blobs
+
+def test_refresh_after_failed_builder(storage):
+    snapshot = snapshot_service.load_reference_snapshot()
+
+    def failing_builder(s):
+        raise ValueError("bad blob")
+
+    with pytest.raises(ValueError):
+        snapshot.derive("tiers", failing_builder, depends_on=["borischen_tiers.json"])
+
+    storage["versions"]["hand_calculated_projections.json"] += 1
+    refreshed = snapshot_service.refresh_reference_snapshot(snapshot)
+    assert "tiers" not in refreshed._derived
+    assert refreshed.derive("tiers", lambda s: "built", depends_on=["borischen_tiers.json"]) == "built"
+
+def test_refresh_drops_indexes_unused_since_last_refresh(storage):
+    snapshot = snapshot_service.load_reference_snapshot()
+    snapshot.derive(("league_distributions", "old league"), lambda s: {}, depends_on=["stat_distributions.json"])
+    snapshot.derive(("league_distributions", "active league"), lambda s: {}, depends_on=["stat_distributions.json"])
+
+    # Both were used before the first refresh
+    assert snapshot_service.refresh_reference_snapshot(snapshot) is snapshot
+    assert len(snapshot._derived) == 2
+
+    snapshot.derive(("league_distributions", "active league"), lambda s: {}, depends_on=["stat_distributions.json"])
+    assert snapshot_service.refresh_reference_snapshot(snapshot) is snapshot
+    assert set(snapshot._derived) == {("league_distributions", "active league")}
+
+    storage["versions"]["owned.json"] += 1
+    refreshed = snapshot_service.refresh_reference_snapshot(snapshot)
+    assert refreshed._derived == {}
@@ -1,5 +1,5 @@
 import React, { useState, useEffect, useCallback } from 'react';
-import PlayerTable from './PlayerTable';
+import PlayerTable, { PlayerQuantiles } from './PlayerTable';
 import { useUUID } from '../context/UUIDContext';
 import { VStack, HStack, Button, Text } from '@chakra-ui/react';
 
@@ -28,6 +28,7 @@ const DynamicTabs: React.FC<DynamicTabsProps> = ({ showTabs }) => {
   const [selectedTab, setSelectedTab] = useState<string | null>(null);
   const [suggestedStarts, setSuggestedStarts] = useState<Player[] | null>(null);
   const [freeAgentRecs, setFreeAgentRecs] = useState<any>(null);
+  const [quantiles, setQuantiles] = useState<PlayerQuantiles>({});
   const [error, setError] = useState<string | null>(null);
 
   const userUUID = useUUID();
@@ -39,6 +40,7 @@ const DynamicTabs: React.FC<DynamicTabsProps> = ({ showTabs }) => {
 
       setSuggestedStarts(null);
       setFreeAgentRecs(null);
+      setQuantiles({});
       setError(null);
 
       fetch(`${API_BASE}/load-league-data?league=${encodeURIComponent(leagueName)}`, {
@@ -52,6 +54,7 @@ const DynamicTabs: React.FC<DynamicTabsProps> = ({ showTabs }) => {
           // Now we set both parts of the response
           setSuggestedStarts(data.suggested_starts);
           setFreeAgentRecs(data.free_agent_recs);
+          setQuantiles(data.quantiles ?? {});
           console.log(data.free_agent_recs)
         })
         .catch(err => {
@@ -115,6 +118,7 @@ const DynamicTabs: React.FC<DynamicTabsProps> = ({ showTabs }) => {
         <PlayerTable
           data={suggestedStarts}
           freeAgentRecs={freeAgentRecs} // <-- pass free agents too
+          quantiles={quantiles}
         />
       )}
     </VStack>
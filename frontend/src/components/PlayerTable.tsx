@@ -31,11 +31,18 @@ interface Player {
   BOOM?: string;            
   BUST?: string;
   PERCENTILES?: string;   
+  QUANTILES?: number[] | string;
+}
+
+// Quantile lists of the league's players, keyed by PID (NAME for players without one)
+export interface PlayerQuantiles {
+  [player: string]: number[];
 }
 
 interface PlayerTableProps {
   data: Player[];
   freeAgentRecs?: { [position: string]: Player[] }; 
+  quantiles?: PlayerQuantiles;
 }
 
 // Tier colors
@@ -58,6 +65,26 @@ const getColorForRank = (rank?: string) => {
   return tierColors[val?.toString()] ?? '#B71C1C';
 };
 
+// QUANTILES holds score values at evenly spaced percentiles from 1 to 100 (100 knots unless the
+// ingest job stores fewer), interpolate them back out to percentiles 1-100
+const expandQuantiles = (quantiles: number[]): Record<number, number> => {
+  const percentiles: Record<number, number> = {};
+  if (quantiles.length === 0) return percentiles;
+  if (quantiles.length === 1) {
+    for (let p = 1; p <= 100; p++) percentiles[p] = quantiles[0];
+    return percentiles;
+  }
+  const spacing = 99 / (quantiles.length - 1);
+  for (let p = 1; p <= 100; p++) {
+    const position = (p - 1) / spacing;
+    const below = Math.min(Math.floor(position), quantiles.length - 2);
+    const fraction = position - below;
+    const value = quantiles[below] + (quantiles[below + 1] - quantiles[below]) * fraction;
+    percentiles[p] = Math.round(value * 100) / 100;
+  }
+  return percentiles;
+};
+
 // Grid template
 const useTemplateColumns = () =>
   useBreakpointValue({
@@ -67,6 +94,7 @@ const useTemplateColumns = () =>
 
 interface PlayerRowProps {
   p: Player;
+  quantiles?: number[];
   isStarter: boolean;
   templateCols: string;
   expanded: boolean;
@@ -75,6 +103,7 @@ interface PlayerRowProps {
 
 const PlayerRow: React.FC<PlayerRowProps> = ({
   p,
+  quantiles,
   isStarter,
   templateCols,
   expanded,
@@ -82,9 +111,13 @@ const PlayerRow: React.FC<PlayerRowProps> = ({
 }) => {
   const [threshold, setThreshold] = useState(10);
 
-  // Use percentiles directly, keys might be strings, convert to numbers safely
+  // Quantiles come from the league's per player map, rows cached before it carry their own QUANTILES.
+  // PERCENTILES is the expanded form (keys might be strings)
+  const rowQuantiles = quantiles ?? (Array.isArray(p.QUANTILES) ? p.QUANTILES : undefined);
   const percentiles: Record<number, number> | null =
-    p.PERCENTILES && p.PERCENTILES !== 'N/A'
+    rowQuantiles
+      ? expandQuantiles(rowQuantiles.map(Number))
+      : p.PERCENTILES && p.PERCENTILES !== 'N/A'
       ? Object.fromEntries(
           Object.entries(p.PERCENTILES).map(([k, v]) => [Number(k), Number(v)])
         )
@@ -333,7 +366,7 @@ const PlayerRow: React.FC<PlayerRowProps> = ({
   );
 };
 
-const PlayerTable: React.FC<PlayerTableProps> = ({ data, freeAgentRecs }) => {
+const PlayerTable: React.FC<PlayerTableProps> = ({ data, freeAgentRecs, quantiles }) => {
   const [expandedRow, setExpandedRow] = useState<string | null>(null);
   const starters = data.filter((p) => p.POS !== 'BN');
   const bench = data.filter((p) => p.POS === 'BN');
@@ -362,6 +395,7 @@ const PlayerTable: React.FC<PlayerTableProps> = ({ data, freeAgentRecs }) => {
             <PlayerRow
               key={`${p.PID ?? p.NAME}-starter-${i}`}
               p={p}
+              quantiles={quantiles?.[p.PID ?? p.NAME]}
               isStarter
               templateCols={templateCols!}
               expanded={expandedRow === (p.PID ?? p.NAME)}
@@ -386,6 +420,7 @@ const PlayerTable: React.FC<PlayerTableProps> = ({ data, freeAgentRecs }) => {
             <PlayerRow
               key={`${p.PID ?? p.NAME}-bench-${i}`}
               p={p}
+              quantiles={quantiles?.[p.PID ?? p.NAME]}
               isStarter={false}
               templateCols={templateCols!}
               expanded={expandedRow === (p.PID ?? p.NAME)}
@@ -414,6 +449,8 @@ const PlayerTable: React.FC<PlayerTableProps> = ({ data, freeAgentRecs }) => {
                 <PlayerRow
                   key={`${p.PID ?? p.NAME}-fa-${pos}-${i}`}
                   p={p}
+                  quantiles={quantiles?.[p.PID ?? p.NAME]}
+              quantiles={quantiles?.[p.PID ?? p.NAME]}
                   isStarter={false}
                   templateCols={templateCols!}
                   expanded={expandedRow === (p.PID ?? p.NAME)}